@@ -12,9 +12,28 @@ to the destination vertex, and False otherwise. The initialization of R
 performs a linear number of bitvector operations, after which each reachability
 test takes constant time to perform.
 
+Because each bitvector has one bit per vertex, Reachability needs quadratic
+space. For large DAGs, use instead
+    R = ReachabilityIndex(G, labels=2, chunk=4096)
+    ...
+    R.reachable(source,destination)
+    R.reachable_many([(source,destination),...])
+ReachabilityIndex stores a constant number of interval labels per vertex
+(the GRAIL scheme of Yildirim, Chaoji, and Zaki, "GRAIL: scalable
+reachability index for large graphs", VLDB 2010), taken from randomized
+depth first searches. Containment of the intervals of the search tree
+proves that a path exists, and non-containment of the intervals that cover
+each vertex's descendants proves that none does. Single queries that these
+labels do not decide are answered by a depth first search pruned by the
+labels. Batches of queries are answered by a bit-parallel computation like
+that of Reachability, but restricted to chunk destination vertices at a
+time, so that it never uses more than (number of vertices) * chunk bits.
+
 D. Eppstein, April 2009.
 """
 
+import random
+
 from .partial_order import TopologicalOrder
 
 
@@ -37,3 +56,125 @@ class Reachability:
         """Test whether the DAG has a path from source to destination."""
         return ((1 << self.key[destination]) & self.canReach[self.key[source]]
                 != 0)
+
+
+class ReachabilityIndex:
+
+    def __init__(self, G, labels=2, chunk=1 << 12):
+        """Initialize a compact reachability index for the given DAG."""
+        L = TopologicalOrder(G)
+        self.key = {L[i]: i for i in range(len(L))}
+        self.chunk = chunk
+        self._successors = [[self.key[w] for w in G[v]] for v in L]
+        self._labels = [self._label(i > 0) for i in range(max(labels, 1))]
+
+    def _label(self, shuffle):
+        """Number the vertices by a depth first search postorder, in the
+        given order or in random order if shuffle is true, and return
+        a triple (low,post,treelow) of lists: post gives the postorder
+        numbers, low[v] is the smallest postorder number of a vertex
+        reachable from v, and treelow[v] is the smallest postorder number
+        of a descendant of v in the depth first search tree."""
+        successors = self._successors
+        n = len(successors)
+        roots = list(range(n))
+        if shuffle:
+            random.shuffle(roots)
+        post = [-1] * n
+        treelow = [0] * n
+        visited = [False] * n
+        count = 0
+        for root in roots:
+            if visited[root]:
+                continue
+            visited[root] = True
+            treelow[root] = count
+            stack = [(root, self._children(root, shuffle))]
+            while stack:
+                v, children = stack[-1]
+                for w in children:
+                    if not visited[w]:
+                        visited[w] = True
+                        treelow[w] = count
+                        stack.append((w, self._children(w, shuffle)))
+                        break
+                else:
+                    stack.pop()
+                    post[v] = count
+                    count += 1
+        low = post[:]
+        for v in reversed(range(n)):    # successors come later in order
+            for w in successors[v]:
+                if low[w] < low[v]:
+                    low[v] = low[w]
+        return low, post, treelow
+
+    def _children(self, v, shuffle):
+        """Iterator for the successors of v, in random order if shuffle."""
+        if not shuffle:
+            return iter(self._successors[v])
+        children = list(self._successors[v])
+        random.shuffle(children)
+        return iter(children)
+
+    def _decide(self, a, b):
+        """Try to decide reachability from labels alone.
+        Returns True or False, or None if the labels are not enough."""
+        if a == b:
+            return True
+        if a > b:
+            return False        # b is earlier in topological order
+        for low, post, treelow in self._labels:
+            if low[b] < low[a] or post[b] > post[a]:
+                return False
+        for low, post, treelow in self._labels:
+            if treelow[a] <= post[b] <= post[a]:
+                return True     # b is a descendant of a in the DFS tree
+        return None
+
+    def reachable(self, source, destination):
+        """Test whether the DAG has a path from source to destination."""
+        a, b = self.key[source], self.key[destination]
+        decision = self._decide(a, b)
+        if decision is not None:
+            return decision
+        visited = {a}
+        stack = [a]
+        while stack:
+            v = stack.pop()
+            for w in self._successors[v]:
+                if w == b:
+                    return True
+                if w not in visited and self._decide(w, b) is not False:
+                    visited.add(w)
+                    stack.append(w)
+        return False
+
+    def reachable_many(self, pairs):
+        """Test reachability for a sequence of (source,destination) pairs.
+        Returns a list of boolean values, one per pair."""
+        results = []
+        pending = {}    # chunk number => list of undecided queries
+        for source, destination in pairs:
+            a, b = self.key[source], self.key[destination]
+            decision = self._decide(a, b)
+            if decision is None:
+                pending.setdefault(b // self.chunk, []).append(
+                    (len(results), a, b))
+            results.append(decision)
+
+        successors = self._successors
+        for c in pending:
+            start = c * self.chunk
+            end = min(start + self.chunk, len(successors))
+            first = min(a for i, a, b in pending[c])
+            bits = [0] * (end - first)  # bits[v-first] = reachable in chunk
+            for v in range(end - 1, first - 1, -1):
+                x = 1 << (v - start) if v >= start else 0
+                for w in successors[v]:
+                    if w < end:
+                        x |= bits[w - first]
+                bits[v - first] = x
+            for i, a, b in pending[c]:
+                results[i] = (bits[a - first] >> (b - start)) & 1 == 1
+        return results
@@ -4,10 +4,14 @@ deterministic finite automata, and nondeterministic finite automata.
 """
 
 import sys
+import json
+import mmap
+import struct
+import heapq
 import operator
+from array import array
 
-from .partition_refinement import PartitionRefinement
-from .sequence import Sequence
+from .partition_refinement import IntegerPartitionRefinement
 from .util import arbitrary_item
 
 
@@ -156,6 +160,10 @@ class FiniteAutomaton:
         """Return equivalent regular expression."""
         return self.asNFA().RegExp()
 
+    def compile(self):
+        """Return equivalent DFA with a flat integer transition table."""
+        return _CompileDFA(self.asDFA())
+
     def complement(self):
         """Make automaton recognizing complement of given automaton's
         language.
@@ -270,62 +278,172 @@ class NFA(FiniteAutomaton):
 
     def RegExp(self):
         """Convert to regular expression and return as a string.
-        See Sipser for an explanation of this algorithm."""
+        See Sipser for an explanation of this algorithm.  We store only
+        the nonempty entries of the matrix of expressions connecting pairs
+        of states, repeatedly eliminate the state with the fewest pairs of
+        incoming and outgoing transitions, and build the expressions as a
+        DAG of shared subexpressions that is converted to a string only
+        at the end.  Returns None if the language is empty."""
 
         # create artificial initial and final states
         initial = object()
         final = object()
-        states = {initial, final} | set(self.states())
+        E = _Expressions()
+        out = {initial: {}, final: {}}      # out[x][y] = expression x->y
+        into = {initial: {}, final: {}}     # into[y][x] = same expression
 
-        # 2d matrix of expressions connecting each pair of states
-        expr = {}
-        for x in states:
-            for y in states:
-                expr[x, y] = None
-        for x in self.states():
-            if x in self.initial:
-                expr[initial, x] = ''
-            if self.isfinal(x):
-                expr[x, final] = ''
-            expr[x, x] = ''
+        def connect(x, y, e):
+            if y in out[x]:
+                e = E.union(out[x][y], e)
+            out[x][y] = into[y][x] = e
+
+        order = {}
         for x in self.states():
+            order[x] = len(order)
+            out.setdefault(x, {})
+            into.setdefault(x, {})
             for c in self.alphabet:
                 for y in self.transition(x, c):
-                    if expr[x, y]:
-                        expr[x, y] += '+' + str(c)
-                    else:
-                        expr[x, y] = str(c)
-
-        # eliminate states one at a time
-        for s in self.states():
-            states.remove(s)
-            for x in states:
-                for y in states:
-                    if expr[x, s] is not None and expr[s, y] is not None:
-                        xsy = []
-                        if expr[x, s]:
-                            xsy += self._parenthesize(expr[x, s])
-                        if expr[s, s]:
-                            xsy += self._parenthesize(expr[s, s], True) + ['*']
-                        if expr[s, y]:
-                            xsy += self._parenthesize(expr[s, y])
-                        if expr[x, y] is not None:
-                            xsy += ['+', expr[x, y] or '()']
-                        expr[x, y] = ''.join(xsy)
-        return expr[initial, final]
-
-    def _parenthesize(self, expr, starring=False):
-        """Return list of strings with or without parens for use in RegExp.
-        This is only for the purpose of simplifying the expressions returned,
-        by omitting parentheses or other expression features when unnecessary;
-        it would always be correct simply to return ['(',expr,')'].
-        """
-        if len(expr) == 1 or (not starring and '+' not in expr):
-            return [expr]
-        elif starring and expr.endswith('+()'):
-            return ['(', expr[:-3], ')']  # +epsilon redundant when starring
-        else:
-            return ['(', expr, ')']
+                    out.setdefault(y, {})
+                    into.setdefault(y, {})
+                    connect(x, y, E.symbol(c))
+            if x in self.initial:
+                connect(initial, x, E.epsilon)
+            if self.isfinal(x):
+                connect(x, final, E.epsilon)
+
+        def degree(s):
+            loop = s in out[s]
+            return (len(into[s]) - loop) * (len(out[s]) - loop)
+
+        # eliminate states one at a time, by a minimum degree heuristic
+        queue = [(degree(s), order[s], s) for s in order]
+        heapq.heapify(queue)
+        while queue:
+            d, i, s = heapq.heappop(queue)
+            if s not in out:
+                continue            # already eliminated
+            if d != degree(s):
+                heapq.heappush(queue, (degree(s), i, s))
+                continue
+            loop = out[s].pop(s, None)
+            into[s].pop(s, None)
+            if loop is not None:
+                loop = E.star(loop)
+            for x in into[s]:
+                del out[x][s]
+            for y in out[s]:
+                del into[y][s]
+            for x, xs in into[s].items():
+                if loop is not None:
+                    xs = E.concatenate(xs, loop)
+                for y, sy in out[s].items():
+                    connect(x, y, E.concatenate(xs, sy))
+            neighbors = set(into[s]) | set(out[s])
+            del out[s], into[s]
+            for x in neighbors:
+                if x is not initial and x is not final:
+                    heapq.heappush(queue, (degree(x), order[x], x))
+
+        if final not in out[initial]:
+            return None
+        return E.string(out[initial][final])
+
+
+class _Expressions:
+
+    """Hash-consed DAG of regular expressions, for use by NFA.RegExp.
+    Each expression is represented by a small integer, the index of
+    a node of the DAG; nodes are tuples (operator, operands...), and
+    equal expressions are always represented by the same node.
+    Unions are n-ary, with operands in sorted order, so that unions
+    of the same subexpressions in different orders are identified.
+    We simplify away concatenations with epsilon and redundant stars.
+    """
+
+    def __init__(self):
+        self.nodes = [('',)]
+        self.index = {('',): 0}
+        self.epsilon = 0
+
+    def _node(self, node):
+        if node not in self.index:
+            self.index[node] = len(self.nodes)
+            self.nodes.append(node)
+        return self.index[node]
+
+    def symbol(self, c):
+        return self._node(('c', c))
+
+    def concatenate(self, x, y):
+        if x == self.epsilon:
+            return y
+        if y == self.epsilon:
+            return x
+        return self._node(('.', x, y))
+
+    def _terms(self, x):
+        node = self.nodes[x]
+        return node[1:] if node[0] == '+' else (x,)
+
+    def union(self, x, y):
+        terms = set(self._terms(x)) | set(self._terms(y))
+        if self.epsilon in terms and len(terms) > 1 and \
+                [z for z in terms if self.nodes[z][0] == '*']:
+            terms.remove(self.epsilon)  # already included in starred term
+        if len(terms) == 1:
+            return terms.pop()
+        return self._node(('+',) + tuple(sorted(terms)))
+
+    def star(self, x):
+        node = self.nodes[x]
+        if node[0] == '*' or x == self.epsilon:
+            return x
+        if node[0] == '+' and self.epsilon in node:
+            terms = [z for z in node[1:] if z != self.epsilon]
+            x = terms[0]
+            for z in terms[1:]:
+                x = self.union(x, z)
+            if self.nodes[x][0] == '*':
+                return x
+        return self._node(('*', x))
+
+    def string(self, x):
+        """Convert expression to a string, parenthesizing only as needed."""
+        strings = {}
+        stack = [x]
+        while stack:
+            x = stack[-1]
+            if x in strings:
+                stack.pop()
+                continue
+            node = self.nodes[x]
+            missing = [y for y in node[1:] if node[0] != 'c' and
+                       y not in strings]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            if node[0] == '':
+                strings[x] = ''
+            elif node[0] == 'c':
+                strings[x] = str(node[1])
+                if strings[x] in ('(', ')', '+', '*', '\\'):
+                    strings[x] = '\\' + strings[x]
+            elif node[0] == '+':
+                strings[x] = '+'.join(strings[y] or '()' for y in node[1:])
+            elif node[0] == '.':
+                strings[x] = ''.join(self._parenthesize(y, strings[y], '+')
+                                     for y in node[1:])
+            else:
+                y = node[1]
+                strings[x] = self._parenthesize(y, strings[y], '+.') + '*'
+        return strings[x]
+
+    def _parenthesize(self, x, string, operators):
+        if self.nodes[x][0] in operators:
+            return '(' + string + ')'
+        return string
 
 
 class _DFAfromNFA(DFA):
@@ -517,6 +635,178 @@ def _RenumberNFA(N, offset=0):
     return LookupNFA(N.alphabet, initial, ttable, final)
 
 
+# Compiled automata are stored as flat tables of 32-bit state numbers.
+# The binary format written by CompiledDFA.save and read by loadDFA is:
+#   a header of eight magic bytes, a version byte, a byte order flag
+#   (0 for little-endian, 1 for big-endian tables), a flags byte (bit 0
+#   set when language masks are present), a padding byte,
+#   and four 32-bit little-endian integers: the number of states, the
+#   number of symbols, the initial state, and the length of the alphabet;
+#   the alphabet, as a UTF-8 encoded JSON list of symbols, zero-padded
+#   to a multiple of four bytes;
+#   the transition table, one 32-bit state number per (state,symbol) pair;
+#   the set of accepting states, as a bitmap of (states+7)//8 bytes;
+#   if masks are present, the bitmap is zero-padded to a multiple of four
+#   bytes and followed by one 32-bit language mask per state.
+# The table is written in native byte order so that loadDFA can map it
+# into memory without copying it.
+
+_MAGIC = b'PADSDFA\0'
+_HEADER = struct.Struct('<8sBBBxIIII')
+_MASKS = 1
+_UINT32 = [code for code in 'ILH' if array(code).itemsize == 4][0]
+
+
+class CompiledDFA(DFA):
+
+    """DFA with states numbered 0,1,...,n-1 and a flat transition table.
+    The transition from state s on symbol self.symbols[i] is given by
+    self.table[s * len(self.symbols) + i], and state s is accepting when
+    bit s & 7 of byte s >> 3 of self.final is set.  The table and bitmap
+    may be arrays or read-only views of a memory-mapped file (see loadDFA),
+    so that several processes can share a single copy of a large automaton.
+    A compiled MultiLanguageDFA also has a sequence self.masks giving the
+    bitmask of accepting languages of each state; for other automata,
+    self.masks is None.
+    """
+
+    def __init__(self, symbols, nstates, initial, table, final, masks=None):
+        self.symbols = list(symbols)
+        self.index = {c: i for i, c in enumerate(self.symbols)}
+        self.alphabet = set(self.symbols)
+        self.nstates = nstates
+        self.initial = initial
+        self.table = table
+        self.final = final
+        self.masks = masks
+
+    def __len__(self):
+        return self.nstates
+
+    def __call__(self, symbols):
+        """Test whether sequence of symbols is accepted by the DFA."""
+        state = self.initial
+        k = len(self.symbols)
+        table = self.table
+        index = self.index
+        for symbol in symbols:
+            if symbol not in index:
+                raise LanguageError("Symbol " + repr(symbol) +
+                                    " not in input alphabet")
+            state = table[state * k + index[symbol]]
+        return self.isfinal(state)
+
+    def transition(self, state, symbol):
+        return self.table[state * len(self.symbols) + self.index[symbol]]
+
+    def isfinal(self, state):
+        return (self.final[state >> 3] >> (state & 7)) & 1 == 1
+
+    def states(self):
+        return iter(range(self.nstates))
+
+    def compile(self):
+        return self
+
+    def save(self, output):
+        """Write the automaton to a binary file, for later use by loadDFA.
+        Only automata whose symbols are strings, and whose language masks
+        (if any) fit into 32 bits, can be saved.
+        """
+        for c in self.symbols:
+            if not isinstance(c, (str, unicode)):
+                raise LanguageError("Unable to save non-string symbol " +
+                                    repr(c))
+        if self.masks is not None and any(m >> 32 for m in self.masks):
+            raise LanguageError("Unable to save masks of more than 32 " +
+                                "languages")
+        alphabet = json.dumps(self.symbols).encode('utf-8')
+        flags = _MASKS if self.masks is not None else 0
+        output.write(_HEADER.pack(_MAGIC, 1, sys.byteorder == 'big', flags,
+                                  self.nstates, len(self.symbols),
+                                  self.initial, len(alphabet)))
+        output.write(alphabet + b'\0' * (-len(alphabet) % 4))
+        output.write(array(_UINT32, self.table).tobytes())
+        output.write(bytes(self.final))
+        if self.masks is not None:
+            output.write(b'\0' * (-len(self.final) % 4))
+            output.write(array(_UINT32, self.masks).tobytes())
+
+
+def _CompileDFA(D, states=None):
+    """Number the states of D reachable from its initial state.
+    If a list is supplied as the second argument, the states of D
+    are appended to it in the order of their numbers.
+    """
+    symbols = sorted(D.alphabet, key=repr)
+    number = {D.initial: 0}
+    if states is None:
+        states = []
+    states.append(D.initial)
+    table = array(_UINT32)
+    for state in states:    # grows as we find new states
+        for c in symbols:
+            target = D.transition(state, c)
+            if target not in number:
+                number[target] = len(states)
+                states.append(target)
+            table.append(number[target])
+    final = bytearray((len(states) + 7) >> 3)
+    for i in range(len(states)):
+        if D.isfinal(states[i]):
+            final[i >> 3] |= 1 << (i & 7)
+    return CompiledDFA(symbols, len(states), 0, table, bytes(final))
+
+
+def parseDFA(buffer):
+    """Make a CompiledDFA from the contents of a file written by save().
+    The buffer may be any object supporting the buffer protocol; the
+    transition table and accepting state bitmap of the result are views
+    into the buffer rather than copies of it, whenever possible.
+    """
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        raise LanguageError("Truncated automaton file")
+    magic, version, bigendian, flags, nstates, nsymbols, initial, length = \
+        _HEADER.unpack_from(view)
+    if magic != _MAGIC or version != 1:
+        raise LanguageError("Not a compiled automaton file")
+    start = _HEADER.size
+    symbols = json.loads(view[start:start + length].tobytes().decode('utf-8'))
+    start += length + (-length % 4)
+    end = start + 4 * nstates * nsymbols
+    bitmap = (nstates + 7) >> 3
+    masks = end + bitmap + (-bitmap % 4)
+    if len(view) < end + bitmap or \
+            (flags & _MASKS and len(view) < masks + 4 * nstates):
+        raise LanguageError("Truncated automaton file")
+
+    def words(start, end):
+        if bool(bigendian) == (sys.byteorder == 'big'):
+            return view[start:end].cast(_UINT32)
+        swapped = array(_UINT32, view[start:end].tobytes())
+        swapped.byteswap()
+        return swapped
+
+    table = words(start, end)
+    final = view[end:end + bitmap]
+    if flags & _MASKS:
+        masks = words(masks, masks + 4 * nstates)
+    else:
+        masks = None
+    return CompiledDFA(symbols, nstates, initial, table, final, masks)
+
+
+def loadDFA(filename):
+    """Map a file written by CompiledDFA.save into memory, read-only,
+    and return it as a CompiledDFA.  The operating system shares the
+    mapped pages among all processes that load the same file.
+    """
+    with open(filename, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return parseDFA(buffer)
+
+
 class _ProductDFA(DFA):
 
     """DFA that simulates D1 and D2 and combines their outputs with op."""
@@ -542,6 +832,138 @@ class _ProductDFA(DFA):
         return self.op(f1, f2)
 
 
+class MultiLanguageDFA(DFA):
+
+    """DFA that simulates a sequence of automata in parallel.
+    Its states are tuples of states of the given automata, with None
+    standing for the dead state of an automaton after a symbol outside
+    its alphabet, so the automata need not have the same alphabets.
+    The method accepting(state) returns a bitmask in which bit i is
+    set when the ith automaton accepts; the DFA itself recognizes the
+    union of the languages.  The arguments may be automata, regular
+    languages, or regular expression strings.
+    """
+
+    def __init__(self, automata):
+        self.DFAs = []
+        for A in automata:
+            if isinstance(A, (str, unicode)):
+                A = RegExp(A)
+            elif isinstance(A, RegularLanguage):
+                A = A.recognizer
+            self.DFAs.append(A.asDFA())
+        self.alphabet = set()
+        for D in self.DFAs:
+            self.alphabet |= D.alphabet
+        self.initial = tuple(D.initial for D in self.DFAs)
+
+    def transition(self, state, symbol):
+        return tuple(D.transition(s, symbol)
+                     if s is not None and symbol in D.alphabet else None
+                     for D, s in zip(self.DFAs, state))
+
+    def accepting(self, state):
+        mask = 0
+        for i in range(len(self.DFAs)):
+            if state[i] is not None and self.DFAs[i].isfinal(state[i]):
+                mask |= 1 << i
+        return mask
+
+    def isfinal(self, state):
+        return self.accepting(state) != 0
+
+    def compile(self):
+        """Return a CompiledDFA whose attribute masks lists the
+        accepting bitmask of each numbered state."""
+        states = []
+        C = _CompileDFA(self, states)
+        C.masks = [self.accepting(state) for state in states]
+        return C
+
+
+class Scanner:
+
+    """Report which of a sequence of regular languages contain each prefix
+    of a stream of symbols.  The stream may be supplied in chunks:
+        S = Scanner(languages)
+        for chunk in stream:
+            for position, i in S.scan(chunk):
+                ...     # first position symbols of stream are in language i
+    Each symbol is examined only once, by a single transition of a
+    MultiLanguageDFA.  Its states are constructed as they are first
+    reached and cached with their transitions; if maxstates is given
+    and the cache grows to that many states, it is discarded and rebuilt
+    from the current state, bounding memory at the expense of recomputing
+    transitions.  To find matches that end at each position rather than
+    prefixes, use languages of the form (alphabet)*(pattern).
+    """
+
+    def __init__(self, languages, maxstates=None):
+        self.DFA = MultiLanguageDFA(languages)
+        self.maxstates = maxstates
+        self._flushes = 0
+        self._flush()
+        self.reset()
+
+    def _flush(self):
+        """Discard all cached states."""
+        self._flushes += 1
+        self._number = {}
+        self._states = []
+        self._matches = []
+        self._next = []
+
+    def _intern(self, state):
+        """Find or create the number of a state of self.DFA."""
+        if state not in self._number:
+            if self.maxstates and len(self._states) >= self.maxstates:
+                self._flush()
+            self._number[state] = len(self._states)
+            self._states.append(state)
+            mask = self.DFA.accepting(state)
+            self._matches.append([i for i in range(len(self.DFA.DFAs))
+                                  if mask & (1 << i)])
+            self._next.append({})
+        return self._number[state]
+
+    def reset(self):
+        """Start scanning a new stream."""
+        self.position = 0
+        self._current = self.DFA.initial
+        self._started = False
+
+    def scan(self, chunk):
+        """Advance the scanner over a chunk of symbols and return
+        the list of pairs (position, language index) for the matches
+        that end within it."""
+        output = []
+        state = self._intern(self._current)
+        if not self._started:
+            self._started = True
+            output.extend((0, i) for i in self._matches[state])
+        position = self.position
+        for symbol in chunk:
+            if symbol not in self.DFA.alphabet:
+                raise LanguageError("Symbol " + repr(symbol) +
+                                    " not in input alphabet")
+            position += 1
+            successors = self._next[state]
+            if symbol in successors:
+                state = successors[symbol]
+            else:
+                flushes = self._flushes
+                target = self.DFA.transition(self._states[state], symbol)
+                number = self._intern(target)
+                if flushes == self._flushes:    # successors still valid?
+                    successors[symbol] = number
+                state = number
+            for i in self._matches[state]:
+                output.append((position, i))
+        self.position = position
+        self._current = self._states[state]
+        return output
+
+
 def _ReverseNFA(N):
     """Construct NFA for reversal of original NFA's language."""
     initial = [s for s in N.states() if N.isfinal(s)]
@@ -576,28 +998,41 @@ class _MinimumDFA(DFA):
     """
 
     def __init__(self, D):
+        # number the states and list their predecessors for each symbol
+        states = list(D.states())
+        index = {s: i for i, s in enumerate(states)}
+        n = len(states)
+        predecessors = {c: [[] for i in range(n)] for c in D.alphabet}
+        for i in range(n):
+            for c in D.alphabet:
+                t = index[D.transition(states[i], c)]
+                predecessors[c][t].append(i)
+
         # refine partition of states by reversed neighborhoods
-        N = D.reverse()
-        P = PartitionRefinement(D.states())
-        P.refine([s for s in D.states() if D.isfinal(s)])
-        unrefined = Sequence(P, key=id)
+        P = IntegerPartitionRefinement(n)
+        P.refine([i for i in range(n) if D.isfinal(states[i])])
+        unrefined = list(P)
+        waiting = bytearray([True]) * len(P)
         while unrefined:
-            part = arbitrary_item(unrefined)
-            unrefined.remove(part)
+            part = unrefined.pop()
+            waiting[part] = False
+            members = P.members(part)
             for symbol in D.alphabet:
-                neighbors = set()
-                for state in part:
-                    neighbors |= N.transition(state, symbol)
-                for new, old in P.refine(neighbors):
-                    if old in unrefined or len(new) < len(old):
+                neighbors = predecessors[symbol]
+                for new, old in P.refine([i for x in members
+                                          for i in neighbors[x]]):
+                    waiting.append(False)
+                    if waiting[old] or P.size(new) < P.size(old):
                         unrefined.append(new)
+                        waiting[new] = True
                     else:
                         unrefined.append(old)
+                        waiting[old] = True
 
         # convert partition to DFA
-        P.freeze()
-        self.partition = P
-        self.initial = P[D.initial]
+        classes = [frozenset(states[i] for i in P.members(c)) for c in P]
+        self.partition = {s: classes[P[index[s]]] for s in states}
+        self.initial = self.partition[D.initial]
         self.alphabet = D.alphabet
         self.DFA = D
 
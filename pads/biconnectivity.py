@@ -1,7 +1,11 @@
 """DFS-based algorithm for computing biconnected components."""
 
+import warnings
+from array import array
+
 from .graphs import is_undirected
 from .dfs import Searcher
+from .union_find import UnionFind
 
 disconnected = object()  # flag for BiconnectedComponents
 
@@ -79,6 +83,334 @@ class BiconnectedComponents(Searcher):
         self._components.append(component)
 
 
+class BlockStructure:
+
+    """
+    Blocks, articulation points, bridges, and 2-edge-connected components
+    of an undirected graph G, in the same format as for
+    BiconnectedComponents, found by a single depth first search without
+    building a subgraph for each block. After S = BlockStructure(G):
+
+    - S.articulation_points lists the articulation points of G.
+    - S.bridges lists the bridges of G, as pairs (parent, child) of the
+      depth first search tree.
+    - S.nblocks is the number of blocks, including a block for each
+      isolated vertex as in BiconnectedComponents; they are numbered
+      consecutively from zero in the order in which they are found.
+    - S.edge_block(v,w) gives the number of the block containing edge v,w.
+    - S.vertex_block[v] gives the number of one block containing v;
+      for vertices that are not articulation points, it is their only block.
+    - S.two_edge_component[v] numbers the 2-edge-connected components,
+      the components of the graph formed by removing all bridges.
+    - S.parent[v] and S.depth[v] give the parent of v in the depth first
+      search forest (v itself for the roots) and its distance to the root.
+    - S.odd_blocks is the set of numbers of the blocks that are not
+      bipartite; a block contains an odd cycle exactly when one of its
+      nontree edges connects two vertices of equal depth parity.
+    - S.block_cut_tree() builds the block-cut forest of G, as a graph
+      whose vertices are pairs ("block",i) and ("cut",v), with an edge
+      from each block to each articulation point it contains.
+    """
+
+    def __init__(self, G):
+        """Search for the blocks of graph G."""
+        if not is_undirected(G):
+            raise ValueError("BlockStructure: input not undirected graph")
+        vertices = list(G)
+        index = {v: i for i, v in enumerate(vertices)}
+        neighbors = [[index[w] for w in G[v]] for v in vertices]
+        n = len(vertices)
+        dfsnumber = [-1] * n
+        low = [0] * n
+        parent = list(range(n))
+        depth = [0] * n
+        children = [0] * n
+        nextedge = [0] * n
+        articulation = bytearray(n)
+        vertexblock = [-1] * n
+        twoedge = [-1] * n
+        edgeblock = {}
+        edges = []          # edges of the block being built, as pairs
+        active = []         # vertices of the 2-edge-component being built
+        self.bridges = []
+        self.odd_blocks = set()
+        nblocks = ncomponents = 0
+        visited = 0
+
+        for root in range(n):
+            if dfsnumber[root] >= 0:
+                continue
+            dfsnumber[root] = low[root] = visited
+            visited += 1
+            active.append(root)
+            path = [root]
+            while path:
+                v = path[-1]
+                i = nextedge[v]
+                if i < len(neighbors[v]):
+                    nextedge[v] = i + 1
+                    w = neighbors[v][i]
+                    if dfsnumber[w] < 0:
+                        dfsnumber[w] = low[w] = visited
+                        visited += 1
+                        parent[w] = v
+                        depth[w] = depth[v] + 1
+                        children[v] += 1
+                        edges.append((w, v))
+                        active.append(w)
+                        path.append(w)
+                    elif dfsnumber[w] < dfsnumber[v] and w != parent[v]:
+                        edges.append((v, w))
+                        low[v] = min(low[v], dfsnumber[w])
+                    continue
+
+                # v is finished; close off its block and component
+                path.pop()
+                if v == root:
+                    if not children[v]:
+                        vertexblock[v] = nblocks
+                        nblocks += 1
+                    if children[v] > 1:
+                        articulation[v] = True
+                    while active:
+                        twoedge[active.pop()] = ncomponents
+                    ncomponents += 1
+                    continue
+                u = parent[v]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+                if low[v] >= dfsnumber[u]:
+                    if u != root:
+                        articulation[u] = True
+                    while True:
+                        x, y = edges.pop()
+                        edgeblock[vertices[x], vertices[y]] = nblocks
+                        vertexblock[x] = nblocks
+                        if not (depth[x] - depth[y]) & 1:
+                            self.odd_blocks.add(nblocks)
+                        if (x, y) == (v, u):
+                            break
+                    if vertexblock[u] < 0:
+                        vertexblock[u] = nblocks
+                    nblocks += 1
+                if low[v] > dfsnumber[u]:
+                    self.bridges.append((vertices[u], vertices[v]))
+                    while True:
+                        x = active.pop()
+                        twoedge[x] = ncomponents
+                        if x == v:
+                            break
+                    ncomponents += 1
+
+        self._vertices = vertices
+        self._edgeblock = edgeblock
+        self.nblocks = nblocks
+        self.articulation_points = [vertices[v] for v in range(n)
+                                    if articulation[v]]
+        self.vertex_block = {vertices[v]: vertexblock[v] for v in range(n)}
+        self.two_edge_component = {vertices[v]: twoedge[v]
+                                   for v in range(n)}
+        self.parent = {vertices[v]: vertices[parent[v]] for v in range(n)}
+        self.depth = {vertices[v]: depth[v] for v in range(n)}
+
+    def edge_block(self, v, w):
+        """The number of the block containing edge v,w."""
+        if (v, w) in self._edgeblock:
+            return self._edgeblock[v, w]
+        return self._edgeblock[w, v]
+
+    def block_cut_tree(self):
+        """Graph connecting blocks to the articulation points they contain.
+        """
+        T = {("block", i): set() for i in range(self.nblocks)}
+        for v in self.articulation_points:
+            T["cut", v] = set()
+        for (x, y), b in self._edgeblock.items():
+            for v in (x, y):
+                if ("cut", v) in T:
+                    T["cut", v].add(("block", b))
+                    T["block", b].add(("cut", v))
+        return T
+
+
+class IncrementalBiconnectivity:
+
+    """
+    Blocks of an undirected graph that grows by adding edges, following
+    Westbrook and Tarjan, "Maintaining bridge-connected and biconnected
+    components on-line", Algorithmica 1992. B = IncrementalBiconnectivity(G)
+    finds the blocks of G (by default, an empty graph) with BlockStructure;
+    afterwards B.add_edge(u,v) adds an edge, possibly with new endpoints,
+    and B.same_block(u,v), B.is_articulation(v), B.connected(u,v) and
+    B.num_blocks() answer queries about the current graph. As in
+    BiconnectedComponents, each isolated vertex counts as a block.
+
+    Each connected component is represented by a rooted spanning tree,
+    whose tree edges are partitioned into the blocks of the graph by a
+    union-find structure. Rather than its tree parent, each vertex points
+    to some ancestor within the block of its parent edge, so the path
+    of pointers from any vertex passes through the blocks of the
+    block-cut tree path to the root. An edge within a component merges
+    the blocks on the paths from its endpoints to their nearest common
+    ancestor, and then shortcuts those paths; an edge between components
+    reroots the smaller tree and links it to the larger one.
+    """
+
+    def __init__(self, G=None):
+        if G is None:
+            G = {}
+        S = BlockStructure(G)
+        self._components = UnionFind()
+        self._blocks = UnionFind()
+        self._parent = {}       # pointer to ancestor, or None for roots
+        self._edge = {}         # block of the tree edge from each non-root
+        self._top = {}          # vertex of each block closest to the root
+        self._tops = {}         # number of blocks with each vertex as top
+        self._nextblock = S.nblocks
+        self._count = 0         # number of blocks of edges
+        self._isolated = 0      # number of vertices without edges
+        for v in G:
+            self._components[v]
+            self._tops[v] = 0
+            if S.parent[v] == v:
+                self._parent[v] = None
+                if not G[v]:
+                    self._isolated += 1
+            else:
+                u = self._parent[v] = S.parent[v]
+                self._components.union(v, u)
+                b = self._edge[v] = S.edge_block(v, u)
+                if b not in self._top or S.depth[u] < S.depth[self._top[b]]:
+                    self._top[b] = u
+        for b in self._top:
+            self._blocks[b]
+            self._tops[self._top[b]] += 1
+            self._count += 1
+        for v in G:
+            if self._parent[v] is not None:
+                self._parent[v] = self._top[self._edge[v]]
+
+    def _block(self, v):
+        """The block of the edge from v to its parent, or None for roots."""
+        if self._parent[v] is None:
+            return None
+        return self._blocks[self._edge[v]]
+
+    def _settop(self, b, v):
+        """Make v the top vertex of block b."""
+        self._tops[self._top[b]] -= 1
+        self._top[b] = v
+        self._tops[v] += 1
+
+    def _add_vertex(self, v):
+        if v not in self._parent:
+            self._components[v]
+            self._parent[v] = None
+            self._tops[v] = 0
+            self._isolated += 1
+
+    def _reroot(self, v):
+        """Reverse the pointers on the path from v to its root."""
+        path = [v]
+        while self._parent[path[-1]] is not None:
+            path.append(self._parent[path[-1]])
+        edges = [self._edge[x] for x in path[:-1]]
+        for i in range(len(path) - 1):
+            self._parent[path[i + 1]] = path[i]
+            self._edge[path[i + 1]] = edges[i]
+        for i in reversed(range(len(edges))):
+            self._settop(self._blocks[edges[i]], path[i])
+        self._parent[v] = None
+        self._edge.pop(v, None)
+
+    def add_edge(self, u, v):
+        """Add edge u,v to the graph."""
+        self._add_vertex(u)
+        self._add_vertex(v)
+        if u == v:
+            return
+        for x in (u, v):
+            if self._parent[x] is None and not self._tops[x]:
+                self._isolated -= 1     # no longer isolated
+
+        cu, cv = self._components[u], self._components[v]
+        if cu != cv:
+            # link the smaller tree below the larger one by a new block
+            if self._components.weights[cu] > self._components.weights[cv]:
+                u, v = v, u
+            self._reroot(u)
+            self._components.union(u, v)
+            self._parent[u] = v
+            self._edge[u] = b = self._nextblock
+            self._nextblock += 1
+            self._blocks[b]
+            self._top[b] = v
+            self._tops[v] += 1
+            self._count += 1
+            return
+
+        # walk up alternately from both ends to their common ancestor
+        seen = ({u}, {v})
+        paths = ([u], [v])
+        side = 0
+        while True:
+            x = paths[side][-1]
+            if x in seen[1 - side]:
+                break
+            if self._parent[x] is not None:
+                x = self._parent[x]
+                paths[side].append(x)
+                seen[side].add(x)
+                if x in seen[1 - side]:
+                    break
+            side = 1 - side
+        meet = paths[side][-1]
+        for path in paths:
+            while path[-1] != meet:
+                path.pop()
+            path.pop()
+
+        # merge the blocks of all edges on the two paths
+        merged = {self._block(x) for path in paths for x in path}
+        if len(merged) > 1:
+            top = meet
+            for path in paths:
+                if path and self._top[self._block(path[-1])] != meet:
+                    top = self._top[self._block(path[-1])]
+            for b in merged:
+                self._tops[self._top[b]] -= 1
+            self._blocks.union(*merged)
+            b = self._blocks[next(iter(merged))]
+            self._top[b] = top
+            self._tops[top] += 1
+            self._count -= len(merged) - 1
+        for path in paths:
+            for x in path:
+                self._parent[x] = meet
+
+    def connected(self, u, v):
+        """Are u and v in the same connected component?"""
+        return self._components[u] == self._components[v]
+
+    def same_block(self, u, v):
+        """Is there a block containing both u and v?"""
+        if u == v:
+            return True
+        if not self.connected(u, v):
+            return False
+        bu, bv = self._block(u), self._block(v)
+        return (bu is not None and (bu == bv or self._top[bu] == v)) or \
+            (bv is not None and self._top[bv] == u)
+
+    def is_articulation(self, v):
+        """Does v belong to more than one block?"""
+        return self._tops[v] + (self._parent[v] is not None) > 1
+
+    def num_blocks(self):
+        """The number of blocks, including isolated vertices."""
+        return self._count + self._isolated
+
+
 class NotBiconnected(Exception):
     pass
 
@@ -131,81 +463,141 @@ def is_biconnected(G):
         return False
 
 
-class STOrienter(Searcher):
-    """Subclass for st-orienting a biconnected graph."""
-
-    def __init__(self, G):
-        """Relate edges for st-orientation."""
-        if not is_undirected(G):
-            raise ValueError("input not undirected graph")
-
-        # set up data structures for DFS
-        self._dfsnumber = {}
-        self._low = {}
-        self._down = {}  # down[v] = child we're currently exploring from v
-        self._lowv = {}  # lowv[n] = vertex with low number n
-
-        # The main data structure!
-        # a dictionary mapping edges to lists of edges
-        # each of which should be oriented the same as the key.
-        self.orient = {}
-        self.roots = []  # edges with no predecessor
-
-        # perform the Depth First Search
-        Searcher.__init__(self, G)
-
-        # clean up now-useless data structures
-        del self._dfsnumber, self._low, self._down, self._lowv
+def st_numbering(G, s=None, t=None):
+    """
+    Order the vertices of a biconnected graph G so that s comes first,
+    t comes last, and every other vertex has neighbors both earlier and
+    later in the order. Edge s,t must belong to G; if either is omitted,
+    it is chosen arbitrarily. Returns a list of the vertices of G in order,
+    so that the st-number of each vertex is its position in the list.
+    Raises NotBiconnected if G is not biconnected.
+
+    We use Tarjan's simplification of the algorithm of Even and Tarjan:
+    a depth first search starting with edge s,t finds the low point of
+    each vertex, and then the vertices are inserted in preorder into a
+    linked list, each immediately before or after its parent according
+    to a sign stored at its low point. The search and the list use arrays
+    indexed by vertex number, in time linear in the size of G.
+    """
+    if not is_undirected(G):
+        raise ValueError("st_numbering: graph is not undirected")
+    vertices = list(G)
+    n = len(vertices)
+    if n < 2:
+        raise NotBiconnected
+    if s is None and t is not None:
+        L = st_numbering(G, t)
+        L.reverse()
+        return L
+    if s is None:
+        s = vertices[0]
+    if t is None:
+        for t in G[s]:
+            break
+        else:
+            raise NotBiconnected
+    elif t not in G[s]:
+        raise ValueError("st_numbering: s and t are not adjacent")
+    index = {v: i for i, v in enumerate(vertices)}
+    adjacency = [[index[w] for w in G[v]] for v in vertices]
+    S = index[s]
+    T = index[t]
+
+    # depth first search from s, with t as the only child of s;
+    # dfsnumber and low are numbers in preorder
+    dfsnumber = array('l', [-1]) * n
+    low = array('l', [0]) * n
+    parent = array('l', [-1]) * n
+    preorder = array('l', [S, T])
+    dfsnumber[T] = low[T] = 1
+    dfsnumber[S] = 0
+    parent[T] = S
+    stack = [(T, iter(adjacency[T]))]
+    while stack:
+        v, neighbors = stack[-1]
+        for w in neighbors:
+            if dfsnumber[w] < 0:
+                dfsnumber[w] = low[w] = len(preorder)
+                parent[w] = v
+                preorder.append(w)
+                stack.append((w, iter(adjacency[w])))
+                break
+            elif dfsnumber[w] < low[v] and w != parent[v]:
+                low[v] = dfsnumber[w]
+        else:
+            stack.pop()
+            p = parent[v]
+            if p != S:
+                if low[v] >= dfsnumber[p]:
+                    raise NotBiconnected    # p is an articulation point
+                if low[v] < low[p]:
+                    low[p] = low[v]
+    if len(preorder) < n:
+        raise NotBiconnected    # s is an articulation point, or disconnected
+
+    # insert vertices into a doubly linked list, starting from s,t
+    after = array('l', [-1]) * n
+    before = array('l', [-1]) * n
+    after[S] = T
+    before[T] = S
+    plus = bytearray(n)         # sign of each vertex; s starts negative
+    for v in preorder[2:]:
+        p = parent[v]
+        if plus[preorder[low[v]]]:
+            before[v] = p
+            after[v] = after[p]
+            if after[p] >= 0:
+                before[after[p]] = v
+            after[p] = v
+            plus[p] = 0
+        else:
+            after[v] = p
+            before[v] = before[p]
+            if before[p] >= 0:
+                after[before[p]] = v
+            before[p] = v
+            plus[p] = 1
 
-    def __iter__(self):
-        """Return iterator for sequence of biconnected components."""
-        return iter(self._components)
+    L = []
+    v = S
+    while v >= 0:
+        L.append(vertices[v])
+        v = after[v]
+    return L
 
-    def preorder(self, parent, child):
-        self._low[child] = self._dfsnumber[child] = len(self._dfsnumber)
-        self._lowv[self._low[child]] = self._down[parent] = child
 
-    def backedge(self, source, destination):
-        if self._dfsnumber[destination] < self._dfsnumber[source]:
-            self._low[source] = min(self._low[source],
-                                    self._dfsnumber[destination])
-            if source != self._down[destination]:
-                self.add_orientation(destination, source, destination)
+class STOrienter:
 
-    def postorder(self, parent, child):
-        if self._low[child] != self._dfsnumber[parent]:
-            self._low[parent] = min(self._low[parent], self._low[child])
-            self.add_orientation(child, parent, self._lowv[self._low[child]])
-        elif parent != child:
-            self.roots.append((parent, child))
+    """
+    Deprecated; use st_numbering or st_orientation instead.
+    Kept for compatibility with code that used the former depth first
+    search: STOrienter(G).roots lists a single edge of G, oriented away
+    from the source, or is empty if G is not biconnected, and
+    STOrienter(G).orient maps that edge to a list of all the other edges
+    of G, each oriented the same way as it in an st-orientation.
+    """
 
-    def add_orientation(self, source, dest, anchor):
-        """Store orientation info for source->dest edge.
-        It should be oriented the same as the edge from the anchor
-        to the current child of the anchor."""
-        child = self._down[anchor]
-        L = self.orient.setdefault((anchor, child), [])
-        L.append((source, dest))
+    def __init__(self, G):
+        warnings.warn("STOrienter is deprecated; use st_numbering",
+                      DeprecationWarning, stacklevel=2)
+        self.orient = {}
+        self.roots = []
+        try:
+            L = st_numbering(G)
+        except NotBiconnected:
+            return
+        number = {v: i for i, v in enumerate(L)}
+        root = (L[0], L[-1])
+        self.roots.append(root)
+        self.orient[root] = [(v, w) for v in G for w in G[v]
+                             if number[v] < number[w] and (v, w) != root]
 
 
 def st_orientation(G):
-    """Find an acyclic orientation of G, with one source and one sink."""
-    stO = STOrienter(G)
-    if len(stO.roots) != 1:
-        raise NotBiconnected
-
-    source, dest = stO.roots[0]
-    G = {v: set() for v in G}
-    orientable = []
-
-    while True:
-        G[source].add(dest)
-        for u, v in stO.orient.get((source, dest), []):
-            orientable.append((u, v))
-        for v, u in stO.orient.get((dest, source), []):
-            orientable.append((u, v))
-        if not orientable:
-            break
-        source, dest = orientable.pop()
-
-    return G
+    """
+    Find an acyclic orientation of G, with one source and one sink,
+    by orienting each edge from lower to higher st-number.
+    """
+    L = st_numbering(G)
+    number = {v: i for i, v in enumerate(L)}
+    return {v: {w for w in G[v] if number[w] > number[v]} for v in G}
@@ -4,15 +4,21 @@ Two-color graphs and find related structures.
 D. Eppstein, May 2004.
 """
 
-from .biconnectivity import BiconnectedComponents
-from .graphs import union
+from .biconnectivity import BlockStructure
 from .dfs import search as dfs_search
 from .dfs import nontree as NONTREE
 from .dfs import forward as FORWARD
 
 
 class NonBipartite(Exception):
-    pass
+    """
+    Raised by two_color. If not None, the cycle attribute
+    is a list of the vertices of an odd cycle, in cyclic order.
+    """
+
+    def __init__(self, cycle=None):
+        Exception.__init__(self, cycle)
+        self.cycle = cycle
 
 
 def two_color(G):
@@ -22,11 +28,22 @@ def two_color(G):
     to two colors (True and False).
     """
     color = {}
+    parent = {}
     for v, w, edgetype in dfs_search(G):
         if edgetype is FORWARD:
             color[w] = not color.get(v, False)
+            parent[w] = v
         elif edgetype is NONTREE and color[v] == color[w]:
-            raise NonBipartite
+            # One of v and w is an ancestor of the other in the DFS tree,
+            # and the tree path between them has even length
+            path = [v]
+            while path[-1] != w and path[-1] != parent[path[-1]]:
+                path.append(parent[path[-1]])
+            if path[-1] != w:
+                path = [w]
+                while path[-1] != v:
+                    path.append(parent[path[-1]])
+            raise NonBipartite(path)
     return color
 
 
@@ -63,10 +80,27 @@ def bipartite_orientation(G, adjacency_list_type=set):
     return {v: adjacency_list_type(iter(G[v])) for v in B}
 
 
+def odd_core_mask(G):
+    """
+    Dictionary mapping each vertex of G to True if it participates in
+    an odd cycle, and False otherwise. The blocks with odd cycles are
+    found together with the blocks themselves, in one depth first search.
+    """
+    S = BlockStructure(G)
+    odd = S.odd_blocks
+    return {v: any(S.edge_block(v, w) in odd for w in G[v]) for v in G}
+
+
 def odd_core(G):
     """
     Subgraph of vertices and edges that participate in odd cycles.
     Aka, the union of nonbipartite biconnected components.
     """
-    return union(*[C for C in BiconnectedComponents(G)
-                   if not is_bipartite(C)])
+    S = BlockStructure(G)
+    odd = S.odd_blocks
+    core = {}
+    for v in G:
+        for w in G[v]:
+            if S.edge_block(v, w) in odd:
+                core.setdefault(v, set()).add(w)
+    return core
@@ -0,0 +1,288 @@
+"""BipartiteAssignment.py
+
+Minimum cost maximum cardinality matching in weighted bipartite graphs.
+
+The input format is that of bipartite_matching.matching, a dictionary
+mapping members of U to their neighbors in V, except that graph[u] must
+itself be a dictionary with graph[u][v] giving the cost of edge u,v.
+The output is a dictionary mapping members of V to their matches in U.
+To find a maximum weight matching instead, negate the weights.
+
+Two algorithms are provided. min_cost_matching finds augmenting paths
+one at a time, each by Dijkstra's algorithm on costs made nonnegative
+by dual potentials, as in the Hungarian method and in the sparse form of
+the algorithm of Jonker and Volgenant; its search from each unmatched
+vertex stops as soon as it reaches an unmatched vertex on the other side.
+auction_matching uses Bertsekas' auction algorithm with epsilon-scaling,
+in the Jacobi form where all unassigned vertices bid at once; the bids in
+each round are independent of each other, so they may be spread over a
+pool of processes.
+"""
+
+import heapq
+from multiprocessing import Pool
+from multiprocessing.sharedctypes import RawArray
+
+from .bipartite_matching import IndexedMatching
+
+
+def _WeightedIndex(graph):
+    """
+    Number the vertices of a weighted bipartite graph and store its
+    edges in arrays, as in bipartite_matching._IndexGraph.
+    Returns a tuple (U, V, offsets, targets, costs).
+    """
+    U = list(graph)
+    V = []
+    index = {}
+    offsets = [0]
+    targets = []
+    costs = []
+    for u in U:
+        for v in graph[u]:
+            if v not in index:
+                index[v] = len(V)
+                V.append(v)
+            targets.append(index[v])
+            costs.append(graph[u][v])
+        offsets.append(len(targets))
+    return U, V, offsets, targets, costs
+
+
+def _ShortestAugmentingPaths(offsets, targets, costs, nv):
+    """
+    Match every member of U = range(len(offsets)-1) with minimum total
+    cost, skipping members for which no augmenting path can be found.
+    Returns an array mapping members of V to their matches, or -1.
+
+    We maintain potentials for which every edge u,v has reduced cost
+    costs + potential[u] - potential[v] >= 0, with equality for matched
+    edges, and for which the potentials of unmatched members of V stay
+    at their initial value of zero and are therefore never smaller than
+    those of the matched members. The current matching is then of minimum
+    cost among matchings covering the same members of U.
+    """
+    nu = len(offsets) - 1
+    potentialU = [0] * nu
+    potentialV = [0] * nv
+    matched = [-1] * nv
+    mate = [-1] * nu
+
+    # row reduction, and greedy matching on the edges it makes tight
+    for u in range(nu):
+        if offsets[u] < offsets[u + 1]:
+            cheapest = min(costs[offsets[u]:offsets[u + 1]])
+            potentialU[u] = -cheapest
+            for i in range(offsets[u], offsets[u + 1]):
+                if costs[i] == cheapest and matched[targets[i]] < 0:
+                    matched[targets[i]] = u
+                    mate[u] = targets[i]
+                    break
+
+    for root in range(nu):
+        if mate[root] >= 0:
+            continue
+
+        # Dijkstra's algorithm on the reduced costs, from root until
+        # the first unmatched member of V is found. For each member of V
+        # we record its distance and the member of U preceding it on its
+        # shortest path; each member of U is at the same distance as its
+        # matched partner, or zero for the root.
+        distance = {}
+        pred = {}
+        finished = []
+        heap = [(0, -1, root)]
+        found = -1
+        while heap:
+            d, v, u = heapq.heappop(heap)
+            if v >= 0:
+                if v in pred:
+                    continue
+                pred[v] = u
+                finished.append(v)
+                if matched[v] < 0:
+                    found = v
+                    break
+                u = matched[v]
+            for i in range(offsets[u], offsets[u + 1]):
+                w = targets[i]
+                if w not in pred:
+                    dw = d + costs[i] + potentialU[u] - potentialV[w]
+                    if w not in distance or dw < distance[w]:
+                        distance[w] = dw
+                        heapq.heappush(heap, (dw, w, u))
+        if found < 0:
+            continue
+
+        # update potentials to keep reduced costs nonnegative
+        # and make the shortest path tight
+        D = distance[found]
+        potentialU[root] -= D
+        for v in finished:
+            delta = D - distance[v]
+            potentialV[v] -= delta
+            if matched[v] >= 0:
+                potentialU[matched[v]] -= delta
+
+        # augment along the path
+        v = found
+        while v >= 0:
+            u = pred[v]
+            matched[v], mate[u], v = u, v, mate[u]
+
+    return matched
+
+
+def min_cost_matching(graph):
+    """
+    Find a maximum cardinality matching of minimum total cost in a
+    weighted bipartite graph, by shortest augmenting paths.
+    If no matching covers all of U, each member of U is given an extra
+    private partner at a cost higher than that of any real matching, so
+    that the smallest possible number of these partners is used; in this
+    case costs should be integers for the result to be exact.
+    """
+    U, V, offsets, targets, costs = _WeightedIndex(graph)
+    nu = len(U)
+    nv = len(V)
+    M, A, B = IndexedMatching(offsets, targets, nv)
+    if nv - M.count(-1) < nu:
+        big = 2 * sum(abs(c) for c in costs) + 1
+        padded = [0]
+        paddedTargets = []
+        paddedCosts = []
+        for u in range(nu):
+            paddedTargets += targets[offsets[u]:offsets[u + 1]]
+            paddedCosts += costs[offsets[u]:offsets[u + 1]]
+            paddedTargets.append(nv + u)
+            paddedCosts.append(big)
+            padded.append(len(paddedTargets))
+        M = _ShortestAugmentingPaths(padded, paddedTargets, paddedCosts,
+                                     nv + nu)
+    else:
+        M = _ShortestAugmentingPaths(offsets, targets, costs, nv)
+    return {V[v]: U[M[v]] for v in range(nv) if M[v] >= 0}
+
+
+def _bid(offsets, targets, benefits, prices, bidders, epsilon):
+    """
+    Compute the bids of some unassigned members of U in one round of
+    the auction, for the edges stored in the arrays offsets, targets and
+    benefits and the current prices of the members of V. Returns a list
+    of triples (u, v, price).
+    """
+    bids = []
+    for u in bidders:
+        best = second = None
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            value = benefits[i] - prices[v]
+            if best is None or value > best:
+                best, second, target = value, best, v
+            elif second is None or value > second:
+                second = value
+        if second is None:
+            second = best - epsilon     # no competition, small raise
+        bids.append((u, target, prices[target] + best - second + epsilon))
+    return bids
+
+
+_shared = None      # arrays of auction_matching, in each worker process
+
+
+def _share(offsets, targets, benefits, prices):
+    """
+    Pool initializer for auction_matching: keep the shared arrays of
+    the graph and of the current prices in this process.
+    """
+    global _shared
+    _shared = (memoryview(offsets).cast('B').cast('l'),
+               memoryview(targets).cast('B').cast('l'),
+               memoryview(benefits).cast('B').cast('d'),
+               memoryview(prices).cast('B').cast('d'))
+
+
+def _bid_shared(task):
+    """
+    Compute the bids of some unassigned members of U, using the shared
+    arrays. The task is a pair (bidders, epsilon).
+    """
+    offsets, targets, benefits, prices = _shared
+    bidders, epsilon = task
+    return _bid(offsets, targets, benefits, prices, bidders, epsilon)
+
+
+def _Auction(n, spread, prices, bid):
+    """
+    Run the auction with epsilon-scaling on n bidders, starting from the
+    given prices, which are updated in place. The function bid(bidders,
+    epsilon) returns a sequence of lists of bids for the given bidders,
+    as computed by _bid. Returns a list of the owner of each item.
+    """
+    epsilon = spread
+    while True:
+        epsilon /= 4
+        owner = [-1] * n
+        unassigned = list(range(n))
+        while unassigned:
+            results = list(bid(unassigned, epsilon))
+            winner = {}
+            for bids in results:
+                for u, v, price in bids:
+                    if v not in winner or price > winner[v][1]:
+                        winner[v] = (u, price)
+            unassigned = [u for bids in results for u, v, price in bids
+                          if winner[v][0] != u]
+            for v in winner:
+                u, prices[v] = winner[v]
+                if owner[v] >= 0:
+                    unassigned.append(owner[v])
+                owner[v] = u
+        if epsilon < 1:
+            return owner
+
+
+def auction_matching(graph, processes=None, chunksize=1024):
+    """
+    Find a perfect matching of minimum total cost in a weighted
+    bipartite graph with equally many vertices on each side, by the
+    auction algorithm. Raises ValueError if there is no perfect matching.
+
+    If a number of processes is given, the bids of each round are split
+    into tasks of at most chunksize bidders and computed in parallel by
+    a pool of that many processes, which share the edges and prices.
+    The result is optimal when the costs are integers, and otherwise
+    has total cost within one unit of optimal.
+    """
+    U, V, offsets, targets, costs = _WeightedIndex(graph)
+    n = len(U)
+    M, A, B = IndexedMatching(offsets, targets, len(V))
+    if len(V) != n or M.count(-1):
+        raise ValueError("auction_matching: no perfect matching")
+
+    # Scale the benefits (negated costs) so that an assignment within
+    # epsilon < 1 of optimal for each vertex is optimal overall
+    scale = n + 1
+    benefits = [-c * scale for c in costs]
+    spread = max([abs(c) for c in costs] + [1]) * scale
+    if processes is None:
+        prices = [0] * n
+
+        def bid(bidders, epsilon):
+            return [_bid(offsets, targets, benefits, prices, bidders,
+                         epsilon)]
+
+        owner = _Auction(n, spread, prices, bid)
+    else:
+        shared = (RawArray('l', offsets), RawArray('l', targets),
+                  RawArray('d', benefits), RawArray('d', n))
+        prices = memoryview(shared[3]).cast('B').cast('d')
+        with Pool(processes, _share, shared) as pool:
+
+            def bid(bidders, epsilon):
+                tasks = [(bidders[i:i + chunksize], epsilon)
+                         for i in range(0, len(bidders), chunksize)]
+                return pool.map(_bid_shared, tasks)
+
+            owner = _Auction(n, spread, prices, bid)
+    return {V[v]: U[owner[v]] for v in range(n)}
@@ -1,89 +1,172 @@
 """BipartiteMatching.py
 
 Hopcroft-Karp bipartite maximum-cardinality matching and maximum
-independent set for bipartite graphs.
+independent set for bipartite graphs, and the Dulmage-Mendelsohn
+decomposition describing all maximum matchings.
 
 D. Eppstein, April 2002.
 """
 
+from array import array
+
 from .strong_connectivity import StronglyConnectedComponents
+from .strong_connectivity import ComponentNumbers
 
 
-def matching(graph):
+def _IndexGraph(graph):
     """
-    Find maximum cardinality matching of a bipartite graph (U,V,E).
-    The input format is a dictionary mapping members of U to lists
-    of their neighbors in V.  The output is a triple (M,A,B) where M is a
-    dictionary mapping members of V to their matches in U, A is the part
-    of the maximum independent set in U, and B is the part of the MIS in V.
-    The same object may occur in both U and V, and is treated as two
-    distinct vertices if this happens.
+    Number the vertices of a bipartite graph given in the format of
+    matching(), and store its edges in arrays. Returns a tuple
+    (U, V, index, offsets, targets) where U and V list the vertices of
+    each side in order of their numbers, index maps V back to numbers,
+    and the neighbors of U[i] are numbered targets[offsets[i]:offsets[i+1]].
     """
-
-    # initialize greedy matching (redundant, but faster than full search)
-    matching = {}
-    for u in graph:
+    U = list(graph)
+    V = []
+    index = {}
+    offsets = array('l', [0]) * (len(U) + 1)
+    targets = array('l')
+    for i, u in enumerate(U):
         for v in graph[u]:
-            if v not in matching:
-                matching[v] = u
-                break
+            if v not in index:
+                index[v] = len(V)
+                V.append(v)
+            targets.append(index[v])
+        offsets[i + 1] = len(targets)
+    return U, V, index, offsets, targets
+
+
+def IndexedMatching(offsets, targets, nv, initial=None):
+    """
+    Find maximum cardinality matching of a bipartite graph whose
+    vertices are integers, U = range(len(offsets)-1) and V = range(nv),
+    and in which the neighbors of u are targets[offsets[u]:offsets[u+1]].
+    If initial is given, it should be a sequence mapping each member of
+    V to its match in U, or to -1 if unmatched, describing a valid matching
+    to start the search from; for instance, after adding a few edges to
+    a graph, its previous matching is a good place to start.
+
+    The output is a triple (M,A,B) where M is an array mapping members of V
+    to their matches in U (-1 for unmatched members), A is the part of the
+    maximum independent set in U, and B is the part in V, as in matching().
+
+    We use the Hopcroft-Karp algorithm, with distances from the free
+    vertices stored in an array and an explicit stack in place of the
+    recursive search for vertex-disjoint augmenting paths.
+    """
+    nu = len(offsets) - 1
+    unreached = nu + 1      # distance of vertices not in the layering
+    mate = array('l', [-1]) * nu
+    if initial is None:
+        matched = array('l', [-1]) * nv
+    else:
+        matched = array('l', initial)
+        for v in range(nv):
+            if matched[v] >= 0:
+                mate[matched[v]] = v
+
+    # extend to greedy matching (redundant, but faster than full search)
+    for u in range(nu):
+        if mate[u] < 0:
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if matched[v] < 0:
+                    matched[v] = u
+                    mate[u] = v
+                    break
 
+    dist = array('l', [0]) * nu
+    nextedge = array('l', [0]) * nu
     while True:
-        # structure residual graph into layers
-        # pred[u] gives the neighbor in the previous layer for u in U
-        # preds[v] gives a list of neighbors in the previous layer for v in V
-        # unmatched gives a list of unmatched vertices in final layer of V,
-        # and is also used as a flag value for pred[u] when u is in the first
-        # layer
-        preds = {}
-        unmatched = []
-        pred = {u: unmatched for u in graph}
-        for v in matching:
-            del pred[matching[v]]
-        layer = list(pred)
-
-        # repeatedly extend layering structure by another pair of layers
-        while layer and not unmatched:
-            newLayer = {}
+        # structure residual graph into layers by breadth first search
+        # from the free members of U; we stop after the first layer in
+        # which some alternating path reaches a free member of V
+        free = [u for u in range(nu) if mate[u] < 0]
+        for u in range(nu):
+            dist[u] = unreached
+        for u in free:
+            dist[u] = 0
+        reached = bytearray(nv)
+        layer = free
+        limit = unreached
+        while layer and limit == unreached:
+            nextlayer = []
             for u in layer:
-                for v in graph[u]:
-                    if v not in preds:
-                        newLayer.setdefault(v, []).append(u)
-            layer = []
-            for v in newLayer:
-                preds[v] = newLayer[v]
-                if v in matching:
-                    layer.append(matching[v])
-                    pred[matching[v]] = v
-                else:
-                    unmatched.append(v)
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = targets[i]
+                    reached[v] = True
+                    w = matched[v]
+                    if w < 0:
+                        limit = dist[u] + 1
+                    elif dist[w] == unreached:
+                        dist[w] = dist[u] + 1
+                        nextlayer.append(w)
+            layer = nextlayer
 
         # did we finish layering without finding any alternating paths?
-        if not unmatched:
-            unlayered = {}
-            for u in graph:
-                for v in graph[u]:
-                    if v not in preds:
-                        unlayered[v] = None
-            return (matching, list(pred), list(unlayered))
-
-        # recursively search backward through layers to find alternating paths
-        # recursion returns true if found path, false otherwise
-        def recurse(v):
-            if v in preds:
-                L = preds[v]
-                del preds[v]
-                for u in L:
-                    if u in pred:
-                        pu = pred[u]
-                        del pred[u]
-                        if pu is unmatched or recurse(pu):
-                            matching[v] = u
-                            return True
-            return False
+        if limit == unreached:
+            return (matched, [u for u in range(nu) if dist[u] < unreached],
+                    [v for v in range(nv) if not reached[v]])
+
+        # search forward through layers to find alternating paths;
+        # each member of U on the path stack advances through its edges
+        # via nextedge, and loses its layer when it runs out of edges
+        for u in range(nu):
+            nextedge[u] = offsets[u]
+        for root in free:
+            path = [root]
+            while path:
+                u = path[-1]
+                i = nextedge[u]
+                if i == offsets[u + 1]:
+                    dist[u] = unreached
+                    path.pop()
+                    continue
+                nextedge[u] = i + 1
+                w = matched[targets[i]]
+                if w < 0:
+                    if dist[u] + 1 == limit:
+                        break
+                elif dist[w] == dist[u] + 1:
+                    path.append(w)
+            for u in path:
+                v = targets[nextedge[u] - 1]
+                matched[v] = u
+                mate[u] = v
+                dist[u] = unreached     # path vertices cannot be reused
+
+
+def matching(graph, initial=None):
+    """
+    Find maximum cardinality matching of a bipartite graph (U,V,E).
+    The input format is a dictionary mapping members of U to lists
+    of their neighbors in V.  The output is a triple (M,A,B) where M is a
+    dictionary mapping members of V to their matches in U, A is the part
+    of the maximum independent set in U, and B is the part of the MIS in V.
+    The same object may occur in both U and V, and is treated as two
+    distinct vertices if this happens.
 
-        for v in unmatched:
-            recurse(v)
+    If initial is given, it should be a matching in the same format as
+    M, such as the result of a previous call on a slightly different
+    graph; its pairs that are still edges of the graph, and that do not
+    conflict with each other, are used to start the search.
+    """
+    U, V, index, offsets, targets = _IndexGraph(graph)
+    start = None
+    if initial is not None:
+        start = array('l', [-1]) * len(V)
+        position = {u: i for i, u in enumerate(U)}
+        used = set()
+        for v in initial:
+            u = initial[v]
+            if v in index and u in position and u not in used and \
+                    index[v] in targets[offsets[position[u]]:
+                                        offsets[position[u] + 1]]:
+                start[index[v]] = position[u]
+                used.add(u)
+    M, A, B = IndexedMatching(offsets, targets, len(V), start)
+    return ({V[v]: U[M[v]] for v in range(len(V)) if M[v] >= 0},
+            [U[u] for u in A], [V[v] for v in B])
 
 
 def imperfections(graph):
@@ -126,3 +209,127 @@ def imperfections(graph):
                             components[v, True] != components[w, False]}
 
     return imperfections
+
+
+class DulmageMendelsohn:
+    """
+    Dulmage-Mendelsohn decomposition of a bipartite graph, in the input
+    format of matching(). The members of U and V are numbered by their
+    positions in the lists D.U and D.V, and the decomposition is stored
+    in arrays indexed by these numbers:
+
+    - D.coarseU and D.coarseV give the coarse part of each vertex:
+      0 for the vertices reachable by alternating paths from unmatched
+      members of U (the vertices of U that some maximum matching leaves
+      unmatched, and their neighbors), 2 for those reachable from
+      unmatched members of V, and 1 for the remaining vertices, which
+      every maximum matching matches to each other.
+
+    - D.fineU and D.fineV number the strongly connected components of
+      part 1, or are -1 for vertices in parts 0 and 2. Matched vertices
+      have the same number, and every edge of part 1 goes from a member
+      of U to a member of V with an equal or larger number.
+
+    D.matching is the maximum matching used to find the decomposition,
+    in the format of the output of matching(). An edge belongs to some
+    maximum matching if and only if both endpoints are in part 0, both
+    are in part 2, or both are in the same component of part 1; this
+    is tested by D.allowed(u,v), and D.forbidden() lists the edges that
+    are in no maximum matching. When the graph has a perfect matching,
+    these are exactly the edges reported by imperfections().
+    Apart from the matching, everything takes linear time.
+    """
+
+    def __init__(self, graph):
+        U, V, index, offsets, targets = _IndexGraph(graph)
+        nu, nv = len(U), len(V)
+        M, A, B = IndexedMatching(offsets, targets, nv)
+        self.U, self.V = U, V
+        self._uindex = {u: i for i, u in enumerate(U)}
+        self._vindex = index
+        self._offsets, self._targets = offsets, targets
+        self.matching = {V[v]: U[M[v]] for v in range(nv) if M[v] >= 0}
+        mate = array('l', [-1]) * nu
+        for v in range(nv):
+            if M[v] >= 0:
+                mate[M[v]] = v
+
+        # reverse adjacency, from V to U
+        count = array('l', [0]) * (nv + 1)
+        for v in targets:
+            count[v + 1] += 1
+        for v in range(nv):
+            count[v + 1] += count[v]
+        sources = array('l', [0]) * len(targets)
+        position = array('l', count[:nv])
+        for u in range(nu):
+            for i in range(offsets[u], offsets[u + 1]):
+                sources[position[targets[i]]] = u
+                position[targets[i]] += 1
+
+        # coarse parts, by alternating breadth first searches
+        coarseU = bytearray([1]) * nu
+        coarseV = bytearray([1]) * nv
+        stack = [u for u in range(nu) if mate[u] < 0]
+        for u in stack:
+            coarseU[u] = 0
+        while stack:
+            u = stack.pop()
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if coarseV[v] == 1:
+                    coarseV[v] = 0
+                    coarseU[M[v]] = 0
+                    stack.append(M[v])
+        stack = [v for v in range(nv) if M[v] < 0]
+        for v in stack:
+            coarseV[v] = 2
+        while stack:
+            v = stack.pop()
+            for i in range(count[v], count[v + 1]):
+                u = sources[i]
+                if coarseU[u] == 1:
+                    coarseU[u] = 2
+                    coarseV[mate[u]] = 2
+                    stack.append(mate[u])
+        self.coarseU, self.coarseV = coarseU, coarseV
+
+        # fine components of part 1, as strong components of the graph
+        # with an arc from each member u of U to the partner of each
+        # unmatched neighbor of u; ComponentNumbers numbers them so that
+        # arcs go to smaller numbers, and we reverse that order
+        square = [u for u in range(nu) if coarseU[u] == 1]
+        renumber = array('l', [-1]) * nu
+        for i, u in enumerate(square):
+            renumber[u] = i
+        arcs = array('l', [0]) * (len(square) + 1)
+        heads = array('l')
+        for i, u in enumerate(square):
+            heads.extend(renumber[M[v]]
+                         for v in targets[offsets[u]:offsets[u + 1]]
+                         if coarseV[v] == 1 and v != mate[u])
+            arcs[i + 1] = len(heads)
+        ncomponents, component = ComponentNumbers(arcs, heads)
+        self.fineU = array('l', [-1]) * nu
+        self.fineV = array('l', [-1]) * nv
+        for i, u in enumerate(square):
+            c = ncomponents - 1 - component[i]
+            self.fineU[u] = self.fineV[mate[u]] = c
+        self.components = ncomponents
+
+    def _allowed(self, u, v):
+        """Test edge u,v given by vertex numbers."""
+        if self.coarseU[u] != self.coarseV[v]:
+            return False
+        return self.coarseU[u] != 1 or self.fineU[u] == self.fineV[v]
+
+    def allowed(self, u, v):
+        """Does edge u,v belong to some maximum matching?"""
+        return self._allowed(self._uindex[u], self._vindex[v])
+
+    def forbidden(self):
+        """List the edges (u,v) that belong to no maximum matching."""
+        offsets, targets = self._offsets, self._targets
+        return [(self.U[u], self.V[v]) for u in range(len(self.U))
+                for v in targets[offsets[u]:offsets[u + 1]]
+                if not self._allowed(u, v)]
@@ -15,8 +15,25 @@ sequence of operations is proportional to the number of operations plus
 the maximum priority.
 
 D. Eppstein, July 2016.
+
+ArrayBucketQueue has the same interface, for items 0,1,...,n-1 and
+priorities 0,1,...,maxpriority given when the queue is created. Its
+buckets are doubly linked lists stored in arrays, so that changing the
+priority of an item, and in particular decrementing it, takes constant
+time without creating or destroying any Python objects.
+
+RadixHeap also has the same interface, for arbitrary items with
+non-negative integer priorities that may be very large, as long as no
+priority is smaller than that of the last item returned (as in Dijkstra's
+algorithm). Each item is kept in a bucket indexed by the highest bit in
+which its priority differs from the last priority returned; when the
+first nonempty bucket holds more than one priority, it is redistributed
+into lower buckets. The amortized time per item is proportional to the
+number of bits in the priorities.
 """
 
+from array import array
+
 
 class BucketQueue:
     def __init__(self):
@@ -75,3 +92,159 @@ class BucketQueue:
     def __len__(self):
         """Container class length."""
         return len(self._D)
+
+
+class ArrayBucketQueue:
+    def __init__(self, n, maxpriority):
+        """Create a new empty priority queue for items in range(n)
+        with priorities in range(maxpriority+1)."""
+        self._priority = array('l', [-1]) * n  # -1 for items not in queue
+        self._next = array('l', [-1]) * n
+        self._prev = array('l', [-1]) * n
+        self._first = array('l', [-1]) * (maxpriority + 1)
+        self._N = maxpriority + 1   # lower bound on min priority
+        self._len = 0
+
+    def _unlink(self, item, priority):
+        """Remove an item from the bucket for the given priority."""
+        before = self._prev[item]
+        after = self._next[item]
+        if before >= 0:
+            self._next[before] = after
+        else:
+            self._first[priority] = after
+        if after >= 0:
+            self._prev[after] = before
+
+    def _link(self, item, priority):
+        """Add an item to the bucket for the given priority."""
+        after = self._first[priority]
+        self._first[priority] = item
+        self._prev[item] = -1
+        self._next[item] = after
+        if after >= 0:
+            self._prev[after] = item
+        self._priority[item] = priority
+        if priority < self._N:
+            self._N = priority
+
+    def __getitem__(self, item):
+        """Look up the priority of an item."""
+        if item < 0 or self._priority[item] < 0:
+            raise KeyError(item)
+        return self._priority[item]
+
+    def __delitem__(self, item):
+        """Remove an item from the priority queue."""
+        self._unlink(item, self[item])
+        self._priority[item] = -1
+        self._len -= 1
+
+    def __setitem__(self, item, priority):
+        """Add an element to the priority queue with the given priority."""
+        if not 0 <= priority < len(self._first):
+            raise ValueError("Priority out of range")
+        if item < 0:
+            raise KeyError(item)
+        if self._priority[item] >= 0:
+            self._unlink(item, self._priority[item])
+        else:
+            self._len += 1
+        self._link(item, priority)
+
+    def decrement(self, item):
+        """Reduce the priority of an item in the queue by one."""
+        priority = self[item]
+        if not priority:
+            raise ValueError("Priority out of range")
+        self._unlink(item, priority)
+        self._link(item, priority - 1)
+
+    def __iter__(self):
+        """Repeatedly find and remove the min-priority item from the queue.
+        It is ok for the queue to be modified between iterations."""
+        first = self._first
+        while self._len:
+            while first[self._N] < 0:
+                self._N += 1
+            x = first[self._N]
+            del self[x]
+            yield x
+
+    def items(self):
+        """Variant iterator that generates (item,priority) pairs."""
+        for x in iter(self):
+            yield x, self._N
+
+    def __contains__(self, item):
+        """Container class membership test."""
+        return 0 <= item < len(self._priority) and self._priority[item] >= 0
+
+    def __len__(self):
+        """Container class length."""
+        return self._len
+
+
+class RadixHeap:
+    def __init__(self):
+        """Create a new empty monotone integer priority queue."""
+        self._D = {}        # map from items to priorities
+        self._buckets = []  # sets of items by highest bit differing from _N
+        self._N = 0         # last priority returned
+
+    def _bucket(self, priority):
+        """The bucket for a given priority."""
+        i = (priority ^ self._N).bit_length()
+        while len(self._buckets) <= i:
+            self._buckets.append(set())
+        return self._buckets[i]
+
+    def __getitem__(self, item):
+        """Look up the priority of an item."""
+        return self._D[item]
+
+    def __delitem__(self, item):
+        """Remove an item from the priority queue."""
+        self._bucket(self._D.pop(item)).remove(item)
+
+    def __setitem__(self, item, priority):
+        """Add an element to the priority queue with the given priority."""
+        if not isinstance(priority, int):
+            raise TypeError("Priority must be an integer")
+        if priority < self._N:
+            raise ValueError("Priority smaller than last priority returned")
+        if item in self._D:
+            del self[item]
+        self._D[item] = priority
+        self._bucket(priority).add(item)
+
+    def __iter__(self):
+        """Repeatedly find and remove the min-priority item from the queue.
+        It is ok for the queue to be modified between iterations."""
+        buckets = self._buckets
+        while self._D:
+            if not buckets[0]:
+                i = 1
+                while not buckets[i]:
+                    i += 1
+                items = buckets[i]
+                buckets[i] = set()
+                self._N = min(self._D[x] for x in items)
+                for x in items:
+                    self._bucket(self._D[x]).add(x)
+            x = buckets[0].pop()
+            del self._D[x]
+            yield x
+
+    def items(self):
+        """Variant iterator that generates (item,priority) pairs."""
+        for x in iter(self):
+            yield x, self._N
+
+    def __contains__(self, item):
+        """Container class membership test."""
+        return item in self._D
+
+    def __len__(self):
+        """Container class length."""
+        return len(self._D)
@@ -5,10 +5,223 @@ Find maximum cardinality matchings in general undirected graphs.
 D. Eppstein, UC Irvine, September 6, 2003.
 """
 
+from array import array
+
 from .union_find import UnionFind
 from .util import arbitrary_item
 
 
+def _augment(G, matching, roots, ignore=()):
+    """Search for vertex-disjoint augmenting paths, in a single phase.
+    The search grows alternating trees from the given unmatched roots,
+    and stops at any unmatched vertex, whether a root or not. After each
+    augmentation the two trees containing the path are abandoned, so
+    the paths found need not form a maximal disjoint set; vertices
+    in ignore are treated as if they were not part of the graph.
+    The matching is changed in place.
+    Returns true if the matching size was increased, false otherwise.
+    """
+
+    # Data structures for augmenting path search:
+    #
+    # leader: union-find structure; the leader of a blossom is one
+    # of its vertices (not necessarily topmost), and leader[v] always
+    # points to the leader of the largest blossom containing v
+    #
+    # S: dictionary of blossoms at even levels of the structure tree.
+    # Dictionary keys are names of blossoms (as returned by the union-find
+    # data structure) and values are the structure tree parent of the
+    # blossom
+    # (a T-node, or the top vertex if the blossom is a root of a structure
+    #  tree).
+    #
+    # T: dictionary of vertices at odd levels of the structure tree.
+    # Dictionary keys are the vertices; T[x] is a vertex with an unmatched
+    # edge to x.  To find the parent in the structure tree, use
+    # leader[T[x]].
+    #
+    # unexplored: collection of unexplored vertices within blossoms of S
+    #
+    # base: if x was originally a T-vertex, but becomes part of a blossom,
+    # base[t] will be the pair (v,w) at the base of the blossom, where v
+    # and t
+    # are on the same side of the blossom and w is on the other side.
+    #
+    # tree: dictionary mapping each vertex of the forest to the root
+    # of its structure tree
+    #
+    # dead: set of roots of trees that have already been used for an
+    # augmenting path in this phase, and should no longer be searched
+
+    leader = UnionFind()
+    S = {}
+    T = {}
+    unexplored = []
+    base = {}
+    tree = {}
+    dead = set()
+
+    # Subroutines for augmenting path search.
+    # Many of these are called only from one place, but are split out
+    # as subroutines to improve modularization and readability.
+
+    def blossom(v, w, a):
+        """Create a new blossom from edge v-w with common ancestor a."""
+
+        def find_side(v, w):
+            path = [leader[v]]
+            b = (v, w)   # new base for all T nodes found on the path
+            while path[-1] != a:
+                tnode = S[path[-1]]
+                path.append(tnode)
+                base[tnode] = b
+                unexplored.append(tnode)
+                path.append(leader[T[tnode]])
+            return path
+
+        a = leader[a]   # sanity check
+        path1, path2 = find_side(v, w), find_side(w, v)
+        leader.union(*path1)
+        leader.union(*path2)
+        S[leader[a]] = S[a]  # update structure tree
+
+    topless = object()  # should be unequal to any graph vertex
+
+    def alternating_path(start, goal=topless):
+        """Return sequence of vertices on alternating path from start to goal.
+        The goal must be a T node along the path from the start to
+        the root of the structure tree. If goal is omitted, we find
+        an alternating path to the structure tree root.
+        """
+        path = []
+        while 1:
+            while start in T:
+                v, w = base[start]
+                vs = alternating_path(v, start)
+                vs.reverse()
+                path += vs
+                start = w
+            path.append(start)
+            if start not in matching:
+                return path     # reached top of structure tree, done!
+            tnode = matching[start]
+            path.append(tnode)
+            if tnode == goal:
+                return path     # finished recursive subpath
+            start = T[tnode]
+
+    def alternate(v):
+        """Make v unmatched by alternating the path to the root of its
+        structure tree.
+
+        """
+        path = alternating_path(v)
+        path.reverse()
+        for i in range(0, len(path) - 1, 2):
+            matching[path[i]] = path[i + 1]
+            matching[path[i + 1]] = path[i]
+
+    def add_match(v, w):
+        """Here with an S-S edge vw connecting vertices in different
+        structure trees.  Find the corresponding augmenting path and use it
+        to augment the matching.
+        """
+        alternate(v)
+        alternate(w)
+        matching[v] = w
+        matching[w] = v
+
+    def ss(v, w):
+        """Handle detection of an S-S edge in augmenting path search.
+        Like _augment(), returns true iff the matching size was increased.
+        """
+
+        if leader[v] == leader[w]:
+            return False        # self-loop within blossom, ignore
+
+        if tree[v] != tree[w]:
+            add_match(v, w)
+            dead.add(tree[v])
+            dead.add(tree[w])
+            return True
+
+        # parallel search up two branches of structure tree
+        # until we find a common ancestor of v and w
+        path1, head1 = {}, v
+        path2, head2 = {}, w
+
+        def step(path, head):
+            head = leader[head]
+            parent = leader[S[head]]
+            if parent == head:
+                return head     # found root of structure tree
+            path[head] = parent
+            path[parent] = leader[T[parent]]
+            return path[parent]
+
+        while 1:
+            head1 = step(path1, head1)
+            head2 = step(path2, head2)
+
+            if head1 == head2:
+                blossom(v, w, head1)
+                return False
+
+            if leader[S[head1]] == head1 and leader[S[head2]] == head2:
+                add_match(v, w)
+                return True
+
+            if head1 in path2:
+                blossom(v, w, head1)
+                return False
+
+            if head2 in path1:
+                blossom(v, w, head2)
+                return False
+
+    # Start of main augmenting path search code.
+
+    for v in roots:
+        S[v] = v
+        tree[v] = v
+        unexplored.append(v)
+
+    # index into unexplored, in FIFO order so we get short paths
+    current = 0
+    while current < len(unexplored):
+        v = unexplored[current]
+        current += 1
+        if tree[v] in dead:
+            continue
+
+        for w in G[v]:
+            if w in tree and tree[w] in dead or w in ignore:
+                continue        # matching has changed there, ignore
+
+            if leader[w] in S:  # S-S edge: blossom or augmenting path
+                if ss(v, w):
+                    break
+
+            elif w not in matching:     # unmatched but not a root
+                alternate(v)
+                matching[v] = w
+                matching[w] = v
+                tree[w] = tree[v]
+                dead.add(tree[v])
+                break
+
+            elif w not in T:    # previously unexplored node, add as T-node
+                T[w] = v
+                tree[w] = tree[v]
+                u = matching[w]
+                if leader[u] not in S:
+                    S[u] = w    # and add its match as an S-node
+                    tree[u] = tree[v]
+                    unexplored.append(u)
+
+    return len(dead) > 0
+
+
 def matching(G, initial_matching=None):
     """Find a maximum cardinality matching in a graph G.
     G is represented in modified GvR form: iter(G) lists its vertices;
@@ -19,193 +232,129 @@ def matching(G, initial_matching=None):
     unmatched vertices are omitted from the dictionary.
 
     We use Edmonds' blossom-contraction algorithm, as described e.g.
-    in Galil's 1986 Computing Surveys paper.
+    in Galil's 1986 Computing Surveys paper, organized into phases as
+    in the faster algorithms of Micali-Vazirani and Gabow-Tarjan: each
+    phase grows a single forest of alternating trees, rooted at all of
+    the unmatched vertices, in breadth first order. Whenever the forest
+    reveals an augmenting path we augment the matching, and then discard
+    the two trees containing the path and continue growing the rest
+    of the forest, so that each phase may find several vertex-disjoint
+    augmenting paths in near-linear time. Because the discarded trees
+    may contain vertices of other augmenting paths, these paths need
+    not form a maximal disjoint set, and they need not be shortest, so
+    unlike those algorithms we have no O(sqrt n) bound on the number
+    of phases; in practice it is usually small.
     """
 
     # Copy initial matching so we can use it nondestructively
     # and augment it greedily to reduce main loop iterations
-    matching = greedy_matching(G, initial_matching)
-
-    def augment():
-        """Search for a single augmenting path.
-        Returns true if the matching size was increased, false otherwise.
-        """
+    matching = karp_sipser_matching(G, initial_matching)
 
-        # Data structures for augmenting path search:
-        #
-        # leader: union-find structure; the leader of a blossom is one
-        # of its vertices (not necessarily topmost), and leader[v] always
-        # points to the leader of the largest blossom containing v
-        #
-        # S: dictionary of blossoms at even levels of the structure tree.
-        # Dictionary keys are names of blossoms (as returned by the union-find
-        # data structure) and values are the structure tree parent of the
-        # blossom
-        # (a T-node, or the top vertex if the blossom is a root of a structure
-        #  tree).
-        #
-        # T: dictionary of vertices at odd levels of the structure tree.
-        # Dictionary keys are the vertices; T[x] is a vertex with an unmatched
-        # edge to x.  To find the parent in the structure tree, use
-        # leader[T[x]].
-        #
-        # unexplored: collection of unexplored vertices within blossoms of S
-        #
-        # base: if x was originally a T-vertex, but becomes part of a blossom,
-        # base[t] will be the pair (v,w) at the base of the blossom, where v
-        # and t
-        # are on the same side of the blossom and w is on the other side.
-
-        leader = UnionFind()
-        S = {}
-        T = {}
-        unexplored = []
-        base = {}
-
-        # Subroutines for augmenting path search.
-        # Many of these are called only from one place, but are split out
-        # as subroutines to improve modularization and readability.
-
-        def blossom(v, w, a):
-            """Create a new blossom from edge v-w with common ancestor a."""
-
-            def find_side(v, w):
-                path = [leader[v]]
-                b = (v, w)   # new base for all T nodes found on the path
-                while path[-1] != a:
-                    tnode = S[path[-1]]
-                    path.append(tnode)
-                    base[tnode] = b
-                    unexplored.append(tnode)
-                    path.append(leader[T[tnode]])
-                return path
-
-            a = leader[a]   # sanity check
-            path1, path2 = find_side(v, w), find_side(w, v)
-            leader.union(*path1)
-            leader.union(*path2)
-            S[leader[a]] = S[a]  # update structure tree
-
-        topless = object()  # should be unequal to any graph vertex
-
-        def alternating_path(start, goal=topless):
-            """Return sequence of vertices on alternating path from start to goal.
-            The goal must be a T node along the path from the start to
-            the root of the structure tree. If goal is omitted, we find
-            an alternating path to the structure tree root.
-            """
-            path = []
-            while 1:
-                while start in T:
-                    v, w = base[start]
-                    vs = alternating_path(v, start)
-                    vs.reverse()
-                    path += vs
-                    start = w
-                path.append(start)
-                if start not in matching:
-                    return path     # reached top of structure tree, done!
-                tnode = matching[start]
-                path.append(tnode)
-                if tnode == goal:
-                    return path     # finished recursive subpath
-                start = T[tnode]
-
-        def alternate(v):
-            """Make v unmatched by alternating the path to the root of its
-            structure tree.
-
-            """
-            path = alternating_path(v)
-            path.reverse()
-            for i in range(0, len(path) - 1, 2):
-                matching[path[i]] = path[i + 1]
-                matching[path[i + 1]] = path[i]
-
-        def add_match(v, w):
-            """Here with an S-S edge vw connecting vertices in different
-            structure trees.  Find the corresponding augmenting path and use it
-            to augment the matching.
-            """
-            alternate(v)
-            alternate(w)
-            matching[v] = w
-            matching[w] = v
-
-        def ss(v, w):
-            """Handle detection of an S-S edge in augmenting path search.
-            Like augment(), returns true iff the matching size was increased.
-            """
-
-            if leader[v] == leader[w]:
-                return False        # self-loop within blossom, ignore
-
-            # parallel search up two branches of structure tree
-            # until we find a common ancestor of v and w
-            path1, head1 = {}, v
-            path2, head2 = {}, w
-
-            def step(path, head):
-                head = leader[head]
-                parent = leader[S[head]]
-                if parent == head:
-                    return head     # found root of structure tree
-                path[head] = parent
-                path[parent] = leader[T[parent]]
-                return path[parent]
-
-            while 1:
-                head1 = step(path1, head1)
-                head2 = step(path2, head2)
-
-                if head1 == head2:
-                    blossom(v, w, head1)
-                    return False
-
-                if leader[S[head1]] == head1 and leader[S[head2]] == head2:
-                    add_match(v, w)
-                    return True
-
-                if head1 in path2:
-                    blossom(v, w, head1)
-                    return False
-
-                if head2 in path1:
-                    blossom(v, w, head2)
-                    return False
-
-        # Start of main augmenting path search code.
-
-        for v in G:
-            if v not in matching:
-                S[v] = v
-                unexplored.append(v)
-
-        # index into unexplored, in FIFO order so we get short paths
-        current = 0
-        while current < len(unexplored):
-            v = unexplored[current]
-            current += 1
+    # augment the matching until it is maximum
+    while _augment(G, matching, [v for v in G if v not in matching]):
+        pass
 
-            for w in G[v]:
-                if leader[w] in S:  # S-S edge: blossom or augmenting path
-                    if ss(v, w):
-                        return True
+    return matching
 
-                elif w not in T:    # previously unexplored node, add as T-node
-                    T[w] = v
-                    u = matching[w]
-                    if leader[u] not in S:
-                        S[u] = w    # and add its match as an S-node
-                        unexplored.append(u)
 
-        return False    # ran out of graph without finding an augmenting path
+class DynamicMatching:
+    """Maximum cardinality matching in a graph that changes over time.
+
+    D = DynamicMatching(G) copies the graph G (in the same format as for
+    matching()) and finds a maximum matching for it. Afterwards, the
+    methods add_vertex, remove_vertex, add_edge, and remove_edge change
+    the graph and restore the maximality of the matching. D[v] gives the
+    vertex matched to v, v in D tests whether v is matched, and len(D) is
+    the number of matched edges. D.graph and D.matching give the current
+    graph (as a dictionary of sets) and matching (in the same format as
+    the output of matching()); they should not be changed directly.
+
+    Each update changes the maximum matching size by at most one, and
+    any augmenting path must start at one of the few vertices whose
+    matched partners have been changed by the update, so we need only
+    search for augmenting paths from those vertices, one at a time.
+    A search that finds a path usually explores only a small part of the
+    graph near the update, but a search that fails must explore the whole
+    alternating tree of its starting vertex, which in the worst case can
+    take as long as a single phase of matching().
+    """
 
-    # augment the matching until it is maximum
-    while augment():
-        pass
+    def __init__(self, G=()):
+        """Copy graph G and find a maximum matching in it."""
+        self.graph = {v: set(G[v]) for v in G}
+        self.matching = matching(self.graph)
+
+    def __getitem__(self, v):
+        """The vertex matched to v."""
+        return self.matching[v]
+
+    def __contains__(self, v):
+        """Is v matched?"""
+        return v in self.matching
+
+    def __len__(self):
+        """Number of edges in the matching."""
+        return len(self.matching) // 2
+
+    def _search(self, v, ignore=()):
+        """Look for an augmenting path from unmatched vertex v."""
+        return _augment(self.graph, self.matching, [v], ignore)
+
+    def _unmatch(self, v):
+        """Remove v and its partner from the matching; return the partner."""
+        w = self.matching.pop(v)
+        del self.matching[w]
+        return w
+
+    def add_vertex(self, v):
+        """Add an isolated vertex to the graph."""
+        if v in self.graph:
+            raise ValueError("DynamicMatching: vertex already exists")
+        self.graph[v] = set()
+
+    def remove_vertex(self, v):
+        """Remove a vertex and its incident edges from the graph."""
+        for w in self.graph.pop(v):
+            self.graph[w].remove(v)
+        if v in self.matching:
+            self._search(self._unmatch(v))
+
+    def add_edge(self, u, v):
+        """Add an edge between two existing vertices."""
+        if v in self.graph[u] or u == v:
+            raise ValueError("DynamicMatching: can not add edge")
+        self.graph[u].add(v)
+        self.graph[v].add(u)
+        if u in self.matching:
+            u, v = v, u
+        if u not in self.matching:
+            if v not in self.matching:
+                self.matching[u] = v
+                self.matching[v] = u
+            else:
+                self._search(u)     # any new path must start at u
+            return
+
+        # Both endpoints are matched. Any augmenting path uses the new
+        # edge u-v, so after unmatching u from its partner w there is an
+        # augmenting path from u avoiding w. If there is, we use it,
+        # after which an augmenting path exists only if it starts at w.
+        if len(self.matching) == len(self.graph):
+            return      # no unmatched vertex to end a path
+        w = self._unmatch(u)
+        if self._search(u, ignore=(w,)):
+            self._search(w)
+        else:
+            self.matching[u] = w
+            self.matching[w] = u
 
-    return matching
+    def remove_edge(self, u, v):
+        """Remove an edge from the graph."""
+        self.graph[u].remove(v)
+        self.graph[v].remove(u)
+        if self.matching.get(u) == v:
+            self._unmatch(u)
+            self._search(u) or self._search(v)
 
 
 def greedy_matching(G, initial_matching=None):
@@ -325,3 +474,94 @@ def greedy_matching(G, initial_matching=None):
         add_match(v, w)
 
     return matching
+
+
+def karp_sipser_matching(G, initial_matching=None):
+    """Linear-time greedy heuristic for creating high-cardinality matching.
+    As long as there is a vertex with one unmatched neighbor, we match
+    it to that neighbor, an edge that belongs to some maximum matching.
+    Otherwise, we match a vertex of minimum degree to its neighbor of
+    minimum degree, where degrees count only unmatched neighbors.
+    This is the rule of Karp and Sipser, without the contraction of
+    degree-two vertices performed by greedy_matching.
+
+    The graph is copied into arrays indexed by vertex number, with the
+    vertices of each degree kept in a doubly linked list threaded through
+    two more arrays, so that all steps of the algorithm take constant
+    time per edge of the graph.
+    """
+    matching = {}
+    if initial_matching:
+        for x in initial_matching:
+            matching[x] = initial_matching[x]
+
+    vertices = [v for v in G if v not in matching]
+    index = {v: i for i, v in enumerate(vertices)}
+    n = len(vertices)
+    offsets = array('l', [0]) * (n + 1)
+    targets = array('l')
+    for i, v in enumerate(vertices):
+        targets.extend(index[w] for w in G[v] if w in index and w != v)
+        offsets[i + 1] = len(targets)
+
+    # degree buckets: first[d] is a vertex of degree d, or -1, and
+    # after[v], before[v] link the vertices of the same degree
+    degree = array('l', [offsets[i + 1] - offsets[i] for i in range(n)])
+    first = array('l', [-1]) * (max(degree, default=0) + 2)
+    after = array('l', [-1]) * n
+    before = array('l', [-1]) * n
+    available = bytearray([1]) * n
+
+    def insert(v):
+        d = degree[v]
+        if d > 0:
+            after[v] = first[d]
+            before[v] = -1
+            if first[d] >= 0:
+                before[first[d]] = v
+            first[d] = v
+
+    def remove(v):
+        d = degree[v]
+        if d > 0:
+            if before[v] >= 0:
+                after[before[v]] = after[v]
+            else:
+                first[d] = after[v]
+            if after[v] >= 0:
+                before[after[v]] = before[v]
+
+    for v in range(n):
+        insert(v)
+
+    low = 1     # no nonempty bucket of positive degree is below low
+    while True:
+        if first[1] >= 0:
+            v = first[1]
+        else:
+            while low < len(first) and first[low] < 0:
+                low += 1
+            if low == len(first):
+                break
+            v = first[low]
+        w = -1
+        for i in range(offsets[v], offsets[v + 1]):
+            x = targets[i]
+            if available[x] and (w < 0 or degree[x] < degree[w]):
+                w = x
+        matching[vertices[v]] = vertices[w]
+        matching[vertices[w]] = vertices[v]
+        for x in (v, w):
+            remove(x)
+            available[x] = False
+        for x in (v, w):
+            for i in range(offsets[x], offsets[x + 1]):
+                y = targets[i]
+                if available[y]:
+                    remove(y)
+                    degree[y] -= 1
+                    insert(y)
+                    if 0 < degree[y] < low:
+                        low = degree[y]
+
+    return matching
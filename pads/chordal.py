@@ -7,12 +7,168 @@ Interval Graph Recognition, and Consecutive Ones Testing", Theor.
 Comput. Sci. 234:59-84 (2000), http://www.cs.colostate.edu/~rmm/lexbfs.ps
 
 D. Eppstein, November 2003.
+
+ChordalStructure derives from the same single LexBFS the maximal cliques,
+a clique tree, an optimal coloring, and a maximum independent set of a
+chordal graph. minimal_triangulation adds fill edges to a graph that is
+not chordal, using the MCS-M algorithm of Berry, Blair, Heggernes, and
+Peyton, "Maximum cardinality search for computing minimal
+triangulations of graphs", Algorithmica 39:287-298 (2004).
 """
 
-from .lex_bfs import lex_bfs
+from array import array
+
+from .lex_bfs import LexSweeps
 from .graphs import is_undirected
 
 
+class ChordalStructure:
+
+    """
+    Structure of a chordal graph G, derived from a single LexBFS.
+    Raises ValueError if G is not chordal. Otherwise, C = ChordalStructure(G)
+    provides the following, each in time linear in the size of G:
+
+    - C.perfect_elimination_ordering() lists the vertices of G in an order
+      in which each vertex and its later neighbors form a clique.
+    - C.maximal_cliques() lists the maximal cliques of G, as lists of
+      vertices; there are at most n of them.
+    - C.clique_tree() builds a clique tree (a forest, if G is disconnected)
+      whose vertices are the maximal cliques of G, as frozensets, such that
+      the cliques containing any vertex form a connected subtree.
+    - C.coloring() maps each vertex to one of the colors 0, 1, 2, ...,
+      using as few colors as possible.
+    - C.maximum_independent_set() lists a maximum independent set.
+
+    In the LexBFS order, the earlier neighbors of each vertex form a
+    clique, the latest of which is its parent; we store these neighbors
+    consecutively in a single array, in order by position.
+    """
+
+    def __init__(self, G):
+        S = LexSweeps(G)
+        n = len(S.vertices)
+        order = S.lex_bfs()
+        position = array('l', [0]) * n
+        for i in range(n):
+            position[order[i]] = i
+        offsets = array('l', [0])
+        earlier = array('l')
+        parent = array('l', [-1]) * n
+        tests = [[] for v in range(n)]
+        for v in order:
+            p = -1
+            for w in S.neighbors[v]:
+                if position[w] < position[v]:
+                    earlier.append(w)
+                    if p < 0 or position[w] > position[p]:
+                        p = w
+            parent[v] = p
+            for j in range(offsets[-1], len(earlier)):
+                if earlier[j] != p:
+                    tests[p].append(earlier[j])
+            offsets.append(len(earlier))
+
+        # the earlier neighbors of each vertex, other than its parent,
+        # must also be earlier neighbors of the parent
+        mark = array('l', [-1]) * n
+        for p in range(n):
+            if tests[p]:
+                i = position[p]
+                for j in range(offsets[i], offsets[i + 1]):
+                    mark[earlier[j]] = p
+                for w in tests[p]:
+                    if mark[w] != p:
+                        raise ValueError("ChordalStructure: input not chordal")
+
+        self._vertices = S.vertices
+        self._neighbors = S.neighbors
+        self._order = order
+        self._position = position
+        self._offsets = offsets
+        self._earlier = earlier
+        self._parent = parent
+
+    def _degree(self, v):
+        """Number of earlier neighbors of vertex number v."""
+        i = self._position[v]
+        return self._offsets[i + 1] - self._offsets[i]
+
+    def perfect_elimination_ordering(self):
+        """Vertices in reverse LexBFS order."""
+        return [self._vertices[v] for v in reversed(self._order)]
+
+    def _cliques(self):
+        """
+        Group the vertices into maximal cliques, in LexBFS order.
+        Each vertex either extends the clique of its parent, if that
+        clique consists only of the parent and its earlier neighbors and
+        the vertex is adjacent to all of them, or starts a new clique
+        consisting of itself and its earlier neighbors, adjacent in the
+        clique tree to the clique of its parent.
+        Returns a list of the cliques, as lists of vertex numbers, and a
+        list of the parent of each clique in the clique tree, or -1.
+        """
+        clique = array('l', [-1]) * len(self._vertices)
+        cliques = []
+        treeparent = []
+        for v in self._order:
+            p = self._parent[v]
+            if p >= 0 and self._degree(v) == self._degree(p) + 1 and \
+                    len(cliques[clique[p]]) == self._degree(p) + 1:
+                clique[v] = clique[p]
+                cliques[clique[v]].append(v)
+                continue
+            clique[v] = len(cliques)
+            i = self._position[v]
+            cliques.append(list(self._earlier[self._offsets[i]:
+                                              self._offsets[i + 1]]) + [v])
+            treeparent.append(clique[p] if p >= 0 else -1)
+        return cliques, treeparent
+
+    def maximal_cliques(self):
+        """List the maximal cliques, as lists of vertices."""
+        return [[self._vertices[v] for v in C] for C in self._cliques()[0]]
+
+    def clique_tree(self):
+        """Tree of maximal cliques, in which the cliques containing
+        any vertex form a connected subtree."""
+        cliques, treeparent = self._cliques()
+        cliques = [frozenset(self._vertices[v] for v in C) for C in cliques]
+        T = {C: set() for C in cliques}
+        for i in range(len(cliques)):
+            if treeparent[i] >= 0:
+                T[cliques[i]].add(cliques[treeparent[i]])
+                T[cliques[treeparent[i]]].add(cliques[i])
+        return T
+
+    def coloring(self):
+        """Greedy coloring in LexBFS order, optimal for chordal graphs."""
+        n = len(self._vertices)
+        color = array('l', [0]) * n
+        used = array('l', [-1]) * (n + 1)
+        for v in self._order:
+            i = self._position[v]
+            for j in range(self._offsets[i], self._offsets[i + 1]):
+                used[color[self._earlier[j]]] = v
+            c = 0
+            while used[c] == v:
+                c += 1
+            color[v] = c
+        return {self._vertices[v]: color[v] for v in range(n)}
+
+    def maximum_independent_set(self):
+        """Greedy independent set in perfect elimination order."""
+        blocked = bytearray(len(self._vertices))
+        independent = []
+        for v in reversed(self._order):
+            if not blocked[v]:
+                independent.append(self._vertices[v])
+                for w in self._neighbors[v]:
+                    blocked[w] = True
+        return independent
+
+
 def perfect_elimination_ordering(G):
     """Return a perfect elimination ordering, or raise an exception if not chordal.
     G should be represented in such a way that "for v in G" loops through
@@ -20,21 +176,11 @@ def perfect_elimination_ordering(G):
     instance, G may be a dictionary mapping each vertex to its neighbor set.
     Running time is O(n+m) and additional space usage over G is O(n+m).
     """
-    alreadyProcessed = set()
-    B = list(lex_bfs(G))
-    position = {B[i]: i for i in range(len(B))}
-    leftNeighbors = {}
-    parent = {}
-    for v in B:
-        leftNeighbors[v] = set(G[v]) & alreadyProcessed
-        alreadyProcessed.add(v)
-        if leftNeighbors[v]:
-            parent[v] = B[max([position[w] for w in leftNeighbors[v]])]
-            if not leftNeighbors[v] - {parent[v]} <= leftNeighbors[parent[v]]:
-                raise ValueError(
-                    "Input to perfect_elimination_ordering is not chordal")
-    B.reverse()
-    return B
+    try:
+        return ChordalStructure(G).perfect_elimination_ordering()
+    except ValueError:
+        raise ValueError(
+            "Input to perfect_elimination_ordering is not chordal")
 
 
 def is_chordal(G):
@@ -42,7 +188,67 @@ def is_chordal(G):
     if not is_undirected(G):
         raise ValueError("Input to Chordal is not an undirected graph")
     try:
-        perfect_elimination_ordering(G)
-    except:
+        ChordalStructure(G)
+    except ValueError:
         return False
     return True
+
+
+def minimal_triangulation(G):
+    """
+    Add a minimal set of fill edges to an undirected graph G to make it
+    chordal: a set of edges whose addition makes G chordal, no proper
+    subset of which does so. Returns a pair (H, order) where H is the
+    chordal graph formed by adding the edges, as a dictionary mapping
+    vertices to sets of neighbors, and order is a perfect elimination
+    ordering of H. For chordal inputs, no edges are added.
+
+    MCS-M numbers the vertices from n down to 1, each time choosing an
+    unnumbered vertex v of maximum weight, and then increasing the weight
+    of each unnumbered vertex u reachable from v by a path whose interior
+    vertices are unnumbered and lighter than u, adding the fill edge uv.
+    Each step searches the original graph once, visiting its vertices in
+    order of weight by buckets, so the total time is O(n(n+m)).
+    """
+    if not is_undirected(G):
+        raise ValueError("minimal_triangulation: graph not undirected")
+    vertices = list(G)
+    index = {v: i for i, v in enumerate(vertices)}
+    neighbors = [[index[w] for w in G[v]] for v in vertices]
+    n = len(vertices)
+    weight = array('l', [0]) * n
+    numbered = bytearray(n)
+    reached = array('l', [-1]) * n
+    order = []
+    H = {v: set(G[v]) for v in vertices}
+    for step in range(n):
+        v = max((u for u in range(n) if not numbered[u]),
+                key=lambda u: weight[u])
+        numbered[v] = True
+        reached[v] = step
+        order.append(vertices[v])
+        buckets = [[] for i in range(step + 1)]
+        raised = []
+        for u in neighbors[v]:
+            if not numbered[u] and reached[u] != step:
+                reached[u] = step
+                buckets[weight[u]].append(u)
+                raised.append(u)
+        for level in range(len(buckets)):
+            bucket = buckets[level]
+            while bucket:
+                u = bucket.pop()
+                for w in neighbors[u]:
+                    if not numbered[w] and reached[w] != step:
+                        reached[w] = step
+                        if weight[w] > level:
+                            buckets[weight[w]].append(w)
+                            raised.append(w)
+                            H[vertices[v]].add(vertices[w])
+                            H[vertices[w]].add(vertices[v])
+                        else:
+                            bucket.append(w)
+        for u in raised:
+            weight[u] += 1
+    order.reverse()
+    return H, order
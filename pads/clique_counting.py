@@ -0,0 +1,205 @@
+"""CliqueCounting.py
+
+Count and list triangles and larger cliques in sparse graphs.
+
+We follow Chiba and Nishizeki, "Arboricity and subgraph listing
+algorithms", SIAM J. Computing 14:210-223 (1985), using a degeneracy
+ordering in place of their ordering by degree: each clique is found
+exactly once, from its earliest vertex in the ordering, by repeatedly
+restricting a set of candidates to the later neighbors of a chosen
+candidate. The vertices are renumbered by their positions in the
+ordering and the later neighbors of each vertex are stored as a sorted
+range of a single array, so that cliques are generated with their
+vertices in order, and the time to count the k-cliques is
+O(k m d^(k-2)) for a graph with m edges and degeneracy d.
+
+The counting functions can be given a number of processes, with which
+the work will be split into tasks by ranges of earliest vertices and
+performed by a pool of that many processes. The array representation
+of the orientation is kept in shared memory, so it is sent to each
+process only once.
+"""
+
+from array import array
+from multiprocessing import Pool
+from multiprocessing.sharedctypes import RawArray
+
+from .graphdegeneracy import CoreDecomposition
+
+
+def _Orientation(G):
+    """
+    Renumber the vertices of G by a degeneracy order, and list the later
+    neighbors of each vertex. Returns a tuple (vertices, offsets, targets)
+    where vertices lists the vertices in order and the later neighbors of
+    vertex number v are targets[offsets[v]:offsets[v+1]], sorted.
+    """
+    D = CoreDecomposition(G)
+    position = D.position
+    offsets = array('l', [0])
+    targets = array('l')
+    for v in D.order:
+        i = position[v]
+        targets.extend(sorted([position[w] for w in D.neighbors[v]
+                               if position[w] > i]))
+        offsets.append(len(targets))
+    return [D.vertices[v] for v in D.order], offsets, targets
+
+
+def _cliques(offsets, targets, candidates, k):
+    """
+    Count the k-cliques among a sorted array of candidate vertices
+    that are all adjacent to each other's earlier members.
+    """
+    if k == 1:
+        return len(candidates)
+    S = set(candidates)
+    total = 0
+    if k == 2:
+        for v in candidates:
+            total += len(S.intersection(targets[offsets[v]:offsets[v + 1]]))
+        return total
+    for v in candidates:
+        later = array('l', [w for w in targets[offsets[v]:offsets[v + 1]]
+                            if w in S])
+        if len(later) >= k - 1:
+            total += _cliques(offsets, targets, later, k - 1)
+    return total
+
+
+def _count(task):
+    """
+    Count the k-cliques whose earliest vertex lies in a range.
+    The task is a tuple (offsets, targets, start, stop, k).
+    """
+    offsets, targets, start, stop, k = task
+    total = 0
+    for v in range(start, stop):
+        if offsets[v + 1] - offsets[v] >= k - 1:
+            total += _cliques(offsets, targets,
+                              targets[offsets[v]:offsets[v + 1]], k - 1)
+    return total
+
+
+_shared = None      # orientation arrays, in each worker process
+
+
+def _share(offsets, targets):
+    """
+    Pool initializer for count_k_cliques: keep the shared arrays
+    of the orientation in this process.
+    """
+    global _shared
+    _shared = tuple(memoryview(A).cast('B').cast('l')
+                    for A in (offsets, targets))
+
+
+def _count_shared(task):
+    """
+    Count the k-cliques whose earliest vertex lies in a range, using
+    the shared orientation. The task is a tuple (start, stop, k).
+    """
+    offsets, targets = _shared
+    start, stop, k = task
+    return _count((offsets, targets, start, stop, k))
+
+
+def count_k_cliques(G, k, processes=None, chunksize=4096):
+    """
+    Number of k-vertex cliques in G. If a number of processes is given,
+    the counts for each range of chunksize earliest vertices are
+    computed in parallel by a pool of that many processes.
+    """
+    if k < 1:
+        raise ValueError("count_k_cliques: k must be positive")
+    vertices, offsets, targets = _Orientation(G)
+    n = len(vertices)
+    if k == 1:
+        return n
+    if processes is None:
+        return _count((offsets, targets, 0, n, k))
+    tasks = [(i, min(i + chunksize, n), k) for i in range(0, n, chunksize)]
+    initargs = (RawArray('l', offsets), RawArray('l', targets))
+    with Pool(processes, _share, initargs) as pool:
+        return sum(pool.map(_count_shared, tasks))
+
+
+def triangle_count(G, processes=None, chunksize=4096):
+    """Number of triangles in G, as for count_k_cliques(G, 3)."""
+    return count_k_cliques(G, 3, processes, chunksize)
+
+
+def k_cliques(G, k):
+    """
+    Generate the k-vertex cliques of G, as tuples of vertices
+    in degeneracy order.
+    """
+    if k < 1:
+        raise ValueError("k_cliques: k must be positive")
+    vertices, offsets, targets = _Orientation(G)
+
+    def extend(clique, candidates):
+        if len(clique) == k:
+            yield tuple(vertices[v] for v in clique)
+            return
+        S = set(candidates)
+        for v in candidates:
+            later = [w for w in targets[offsets[v]:offsets[v + 1]]
+                     if w in S]
+            if len(later) >= k - len(clique) - 1:
+                for C in extend(clique + [v], later):
+                    yield C
+
+    return extend([], range(len(vertices)))
+
+
+def _triangles(offsets, targets):
+    """Generate the triangles of an orientation as triples of vertex
+    numbers, in increasing order."""
+    for u in range(len(offsets) - 1):
+        later = targets[offsets[u]:offsets[u + 1]]
+        S = set(later)
+        for v in later:
+            for w in S.intersection(targets[offsets[v]:offsets[v + 1]]):
+                yield u, v, w
+
+
+def vertex_triangle_counts(G):
+    """Dictionary mapping each vertex to the number of triangles
+    containing it."""
+    vertices, offsets, targets = _Orientation(G)
+    count = array('l', [0]) * len(vertices)
+    for u, v, w in _triangles(offsets, targets):
+        count[u] += 1
+        count[v] += 1
+        count[w] += 1
+    return {vertices[i]: count[i] for i in range(len(vertices))}
+
+
+def edge_triangle_counts(G):
+    """
+    Number of triangles containing each edge, as a weighted graph
+    in which T[u][v] = T[v][u] is the count for edge uv.
+    """
+    vertices, offsets, targets = _Orientation(G)
+    T = {v: {w: 0 for w in G[v]} for v in G}
+    for triangle in _triangles(offsets, targets):
+        u, v, w = [vertices[x] for x in triangle]
+        for x, y in ((u, v), (u, w), (v, w)):
+            T[x][y] += 1
+            T[y][x] += 1
+    return T
+
+
+def clustering_coefficients(G):
+    """
+    Dictionary mapping each vertex to its local clustering coefficient,
+    the fraction of pairs of its neighbors that are adjacent, or zero
+    for vertices with fewer than two neighbors.
+    """
+    count = vertex_triangle_counts(G)
+    C = {}
+    for v in G:
+        d = len(G[v])
+        C[v] = 2.0 * count[v] / (d * (d - 1)) if d > 1 else 0.0
+    return C
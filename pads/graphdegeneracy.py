@@ -3,9 +3,31 @@
 Compute the degeneracy of graphs, and degeneracy orderings of graphs.
 
 D. Eppstein, July 2016.
+
+The core number of a vertex is the largest k such that it belongs to
+the k-core, the largest subgraph with minimum degree k. CoreDecomposition
+computes all core numbers and a degeneracy ordering at once, using the
+bin-sort algorithm of Batagelj and Zaversnik, "An O(m) algorithm for
+cores decomposition of networks", arXiv:cs/0310049 (2003), on arrays
+indexed by vertex number; the degeneracy, cores, and degeneracy
+orientation are all derived from this one computation.
+
+core_numbers can alternatively compute the core numbers by the h-index
+iteration of Lu, Zhou, Zhang, and Stanley, "The H-index of a network node
+and its relation to degree and coreness", Nature Communications 7:10168
+(2016): starting from the degrees, repeatedly replace the value of each
+vertex by the h-index of the values of its neighbors (the largest h such
+that at least h of them are at least h) until nothing changes. Each round
+updates all vertices independently, so each round can be split among
+processes. This does more work than the sequential algorithm, so it
+only pays off with enough cores to share it.
 """
+from array import array
+from multiprocessing import Pool
+from multiprocessing.sharedctypes import RawArray
+
 from .graphs import is_undirected
-from .bucketqueue import BucketQueue
+from .bucketqueue import ArrayBucketQueue
 
 
 def degeneracySequence(G):
@@ -14,42 +36,229 @@ def degeneracySequence(G):
     """
     if not is_undirected(G):
         raise TypeError("Graph must be undirected")
-    Q = BucketQueue()
-    for v in G:
-        Q[v] = len(G[v])    # prioritize vertices by degree
-    for v, d in Q.items():
+    vertices = list(G)
+    index = {v: i for i, v in enumerate(vertices)}
+    Q = ArrayBucketQueue(len(vertices),
+                         max([len(G[v]) for v in vertices] + [0]))
+    for i in range(len(vertices)):
+        Q[i] = len(G[vertices[i]])  # prioritize vertices by degree
+    for i, d in Q.items():
+        v = vertices[i]
         yield v, d           # output vertices in priority order
         for w in G[v]:
-            if w in Q:
-                Q[w] -= 1   # one fewer remaining neighbor
+            if index[w] in Q:
+                Q.decrement(index[w])   # one fewer remaining neighbor
+
+
+def _CoreArrays(neighbors):
+    """
+    Core numbers and degeneracy order of the graph with vertices
+    range(len(neighbors)) and the given adjacency lists, as arrays.
+    """
+    n = len(neighbors)
+    degree = array('l', [len(N) for N in neighbors])
+    maxdegree = max(degree) if n else 0
+
+    # sort the vertices by degree, and find where each degree starts
+    start = array('l', [0]) * (maxdegree + 2)
+    for d in degree:
+        start[d + 1] += 1
+    for d in range(maxdegree + 1):
+        start[d + 1] += start[d]
+    order = array('l', [0]) * n
+    position = array('l', [0]) * n
+    for v in range(n):
+        position[v] = start[degree[v]]
+        order[position[v]] = v
+        start[degree[v]] += 1
+    for d in range(maxdegree, 0, -1):
+        start[d] = start[d - 1]
+    start[0] = 0
+
+    # remove vertices in order, moving each neighbor of higher degree
+    # to the start of its bin and then into the next lower bin
+    for i in range(n):
+        v = order[i]
+        for u in neighbors[v]:
+            du = degree[u]
+            if du > degree[v]:
+                pu = position[u]
+                pw = start[du]
+                w = order[pw]
+                if u != w:
+                    order[pu] = w
+                    position[w] = pu
+                    order[pw] = u
+                    position[u] = pw
+                start[du] += 1
+                degree[u] = du - 1
+    return degree, order
+
+
+_shared = None      # arrays of core_numbers, in each worker process
+
+
+def _share(offsets, targets, values):
+    """
+    Pool initializer for core_numbers: keep the shared arrays of the
+    graph and of the current values in this process, so that they are
+    sent to each worker once rather than with every task.
+    """
+    global _shared
+    _shared = tuple(memoryview(A).cast('B').cast('l')
+                    for A in (offsets, targets, values))
+
+
+def _hindex(vertices):
+    """
+    Compute one round of the h-index iteration for a list of vertex
+    numbers, using the shared arrays. Returns a list of new values.
+    """
+    offsets, targets, values = _shared
+    result = []
+    for v in vertices:
+        d = offsets[v + 1] - offsets[v]
+        count = [0] * (d + 1)
+        for u in targets[offsets[v]:offsets[v + 1]]:
+            count[min(values[u], d)] += 1
+        h = d
+        atleast = count[d]
+        while atleast < h:
+            h -= 1
+            atleast += count[h]
+        result.append(h)
+    return result
+
+
+def core_numbers(G, processes=None, chunksize=65536):
+    """
+    Array of the core numbers of the vertices of G, in the order given
+    by list(G). If a number of processes is given, the h-index iteration
+    is used instead of the default sequential algorithm, with each round
+    split into tasks of at most chunksize vertices for a pool of that
+    many processes. The graph and the current values are kept in shared
+    memory, so each task sends only its list of vertex numbers. Each
+    round takes time proportional to the total degree of the vertices
+    it updates, and there may be many rounds, so the pool needs several
+    cores to make up for the extra work.
+    """
+    if not is_undirected(G):
+        raise TypeError("Graph must be undirected")
+    vertices = list(G)
+    index = {v: i for i, v in enumerate(vertices)}
+    neighbors = [[index[w] for w in G[v]] for v in vertices]
+    if processes is None:
+        return _CoreArrays(neighbors)[0]
+
+    n = len(vertices)
+    offsets = RawArray('l', n + 1)
+    targets = RawArray('l', sum(len(N) for N in neighbors))
+    shared = RawArray('l', n)
+    i = 0
+    for v in range(n):
+        for w in neighbors[v]:
+            targets[i] = w
+            i += 1
+        offsets[v + 1] = i
+        shared[v] = len(neighbors[v])
+    values = memoryview(shared).cast('B').cast('l')
+
+    # only vertices with a neighbor changed in the previous round
+    # can change in the next one
+    active = list(range(n))
+    with Pool(processes, _share, (offsets, targets, shared)) as pool:
+        while active:
+            tasks = [active[i:i + chunksize]
+                     for i in range(0, len(active), chunksize)]
+            changed = []
+            i = 0
+            for result in pool.map(_hindex, tasks):
+                for h in result:
+                    if h != values[active[i]]:
+                        changed.append((active[i], h))
+                    i += 1
+            flag = bytearray(n)
+            for v, h in changed:
+                values[v] = h
+                for w in neighbors[v]:
+                    flag[w] = True
+            active = [v for v in range(n) if flag[v]]
+    return array('l', values)
+
+
+class CoreDecomposition:
+    """
+    Core numbers and degeneracy ordering of an undirected graph G,
+    computed once. After D = CoreDecomposition(G):
+
+    - D.vertices lists the vertices of G, D.index maps them to their
+      positions in this list, and D.neighbors lists the neighbors of
+      each vertex by position.
+    - D.core_number is an array of the core numbers of the vertices,
+      and D.order an array of the vertex numbers in a degeneracy order,
+      in which each vertex has at most D.degeneracy() later neighbors;
+      D.position gives the position of each vertex number in D.order.
+    - D.core(k) is the k-core, as in core(G, k).
+    - D.orientation() and D.sequence() are as for degeneracyOrientation(G)
+      and degeneracySequence(G), but for the order D.order.
+    """
+
+    def __init__(self, G):
+        if not is_undirected(G):
+            raise TypeError("Graph must be undirected")
+        self.vertices = list(G)
+        self.index = {v: i for i, v in enumerate(self.vertices)}
+        self.neighbors = [[self.index[w] for w in G[v]]
+                          for v in self.vertices]
+        self.core_number, self.order = _CoreArrays(self.neighbors)
+        self.position = array('l', [0]) * len(self.order)
+        for i in range(len(self.order)):
+            self.position[self.order[i]] = i
+
+    def degeneracy(self):
+        """The largest core number, or zero for an empty graph."""
+        return max(self.core_number) if self.vertices else 0
+
+    def core(self, k=None):
+        """The k-core of G, or the deepest core if k is not given
+        or is larger than the degeneracy, as a set of vertices."""
+        if k is None or k > self.degeneracy():
+            k = self.degeneracy()
+        return {self.vertices[v] for v in range(len(self.vertices))
+                if self.core_number[v] >= k}
+
+    def _later(self, v):
+        """Neighbors of vertex number v later in the order."""
+        position = self.position
+        return [w for w in self.neighbors[v] if position[w] > position[v]]
+
+    def sequence(self):
+        """Generate pairs (vertex,number of later neighbors) in order."""
+        for v in self.order:
+            yield self.vertices[v], len(self._later(v))
+
+    def orientation(self):
+        """Directed version of G with <= degeneracy out-neighbors per vertex.
+        """
+        return {self.vertices[v]: {self.vertices[w] for w in self._later(v)}
+                for v in self.order}
 
 
 def degeneracy(G):
     """Calculate the degeneracy of a given graph"""
-    return max(d for v, d in degeneracySequence(G))
+    return CoreDecomposition(G).degeneracy()
 
 
 def degeneracyOrientation(G):
     """Directed version of G with <= degeneracy out-neighbors per vertex."""
-    D = {}
-    for v, d in degeneracySequence(G):
-        D[v] = {w for w in G[v] if w not in D}
-    return D
+    return CoreDecomposition(G).orientation()
 
 
 def core(G, k=None):
     """The k-core of G, or the deepest core if k is not given.
     The return value is a set of vertices; use Graphs.InducedSubgraph
     if the edges are also needed."""
-    level = 0
-    coreset = set()
-    for v, d in degeneracySequence(G):
-        if d > level:                   # new depth record?
-            if k is None or level < k:  # we care about new records?
-                coreset = set()         # yes, restart core
-                level = d
-        coreset.add(v)
-    return coreset
+    return CoreDecomposition(G).core(k)
 
 
 def triangles(G):
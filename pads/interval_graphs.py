@@ -0,0 +1,120 @@
+"""IntervalGraphs.py
+
+Recognize interval graphs and proper interval graphs by repeated
+lexicographic breadth first search.
+
+An interval graph has a vertex for each of a family of intervals of the
+real line, and an edge for each two intersecting intervals; it is proper
+if no interval contains another, or equivalently if all intervals can be
+given the same length. Both classes can be characterized by vertex
+orderings that can be checked in linear time: a graph is an interval
+graph if and only if its vertices have an ordering in which, whenever
+u < v < w and uw is an edge, uv is also an edge (Olariu, "An optimal
+greedy heuristic to color interval graphs", Inf. Proc. Lett. 37:21-25,
+1991), and a proper interval graph if and only if its vertices have an
+ordering in which every closed neighborhood is contiguous (Roberts, 1969).
+
+For proper interval graphs we use the three-sweep algorithm of Corneil,
+"A simple 3-sweep LBFS algorithm for the recognition of unit interval
+graphs", Discrete Applied Math. 138:371-379 (2004). For interval graphs
+we repeat LexBFS+ sweeps, each breaking ties by the previous one, until
+one produces an ordering of the first type, following the multisweep
+approach of Corneil, Olariu, and Stewart, "The LBFS structure and
+recognition of interval graphs", SIAM J. Discrete Math. 23:1905-1953
+(2009). Either way, an ordering is only reported after it has been
+verified, so a positive answer is always correct.
+"""
+
+from .lex_bfs import LexSweeps
+from .chordal import is_chordal
+from .graphs import is_undirected
+
+
+def _is_interval_order(S, order):
+    """
+    Check whether, in the given order, the later neighbors of each
+    vertex are exactly the vertices up to its last neighbor.
+    """
+    position = [0] * len(order)
+    for i in range(len(order)):
+        position[order[i]] = i
+    for v in order:
+        later = [position[w] for w in S.neighbors[v]
+                 if position[w] > position[v]]
+        if later and max(later) - position[v] != len(later):
+            return False
+    return True
+
+
+def _is_straight_order(S, order):
+    """
+    Check whether the closed neighborhood of each vertex
+    is contiguous in the given order.
+    """
+    position = [0] * len(order)
+    for i in range(len(order)):
+        position[order[i]] = i
+    for v in order:
+        positions = [position[w] for w in S.neighbors[v]] + [position[v]]
+        if max(positions) - min(positions) + 1 != len(positions):
+            return False
+    return True
+
+
+def proper_interval_ordering(G):
+    """
+    Return a list of the vertices of G in which the closed neighborhood
+    of each vertex is contiguous, or None if G is not a proper interval
+    graph. The order is the left-to-right order of the left endpoints
+    of a family of unit intervals representing G.
+    """
+    if not is_undirected(G):
+        raise ValueError("proper_interval_ordering: graph not undirected")
+    S = LexSweeps(G)
+    order = S.lex_bfs()
+    for sweep in range(2):
+        order = S.lex_bfs_plus(order)
+    if not _is_straight_order(S, order):
+        return None
+    return [S.vertices[v] for v in order]
+
+
+def is_proper_interval(G):
+    """Test whether G is a proper (unit) interval graph."""
+    return proper_interval_ordering(G) is not None
+
+
+def interval_ordering(G, sweeps=None):
+    """
+    Return a list of the vertices of G such that, whenever u, v, w appear
+    in that order and uw is an edge, uv is also an edge, or None if no
+    such ordering can be found. The order is the left-to-right order of
+    the left endpoints of a family of intervals representing G.
+
+    Graphs that are not chordal are rejected after a single LexBFS;
+    otherwise at most sweeps LexBFS+ sweeps are performed (by default,
+    one per vertex), each in linear time, stopping early when an ordering
+    is verified or when a sweep repeats an earlier order.
+    """
+    if not is_undirected(G):
+        raise ValueError("interval_ordering: graph not undirected")
+    if not is_chordal(G):
+        return None
+    S = LexSweeps(G)
+    if sweeps is None:
+        sweeps = max(len(S.vertices), 1)
+    order = S.lex_bfs()
+    seen = {order.tobytes()}
+    for sweep in range(sweeps):
+        order = S.lex_bfs_plus(order)
+        if _is_interval_order(S, order):
+            return [S.vertices[v] for v in order]
+        if order.tobytes() in seen:
+            break           # the sweeps have started to repeat
+        seen.add(order.tobytes())
+    return None
+
+
+def is_interval(G):
+    """Test whether G is an interval graph."""
+    return interval_ordering(G) is not None
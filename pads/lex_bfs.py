@@ -7,11 +7,19 @@ and Consecutive Ones Testing", Theor. Comput. Sci. 234:59-84 (2000),
 http://www.cs.colostate.edu/~rmm/lexbfs.ps
 
 D. Eppstein, November 2003.
+
+LexSweeps supports algorithms that perform several lexicographic
+searches of the same graph, each breaking ties according to an earlier
+order, as in the LexBFS+ sweeps of Corneil, "A simple 3-sweep LBFS
+algorithm for the recognition of unit interval graphs", Discrete Applied
+Math. 138:371-379 (2004), and lexicographic depth-first search as
+described by Corneil and Krueger, "A unified view of graph searching",
+SIAM J. Discrete Math. 22:1259-1276 (2008).
 """
 
-from .partition_refinement import PartitionRefinement
-from .sequence import Sequence
-from .util import arbitrary_item
+from array import array
+
+from .partition_refinement import IntegerPartitionRefinement
 
 
 def lex_bfs(G):
@@ -20,15 +28,173 @@ def lex_bfs(G):
     the vertices, and "G[v]" produces a sequence of the neighbors of v; for
     instance, G may be a dictionary mapping each vertex to its neighbor set.
     Running time is O(n+m) and additional space usage over G is O(n).
+
+    The sets of the partition occupy consecutive ranges of its element
+    array, in the order in which they are to be traversed, so the next
+    vertex is always the first one not yet removed from that array.
     """
-    P = PartitionRefinement(G)
-    S = Sequence(P, key=id)
-    while S:
-        set = S[0]
-        v = arbitrary_item(set)
-        yield v
+    vertices = list(G)
+    index = {v: i for i, v in enumerate(vertices)}
+    P = IntegerPartitionRefinement(len(vertices))
+    for i in range(len(vertices)):
+        v = P.element[i]
+        yield vertices[v]
         P.remove(v)
-        if not set:
-            S.remove(set)
-        for new, old in P.refine(G[v]):
-            S.insertBefore(old, new)
+        P.refine([index[w] for w in G[vertices[v]]])
+
+
+class LexSweeps:
+
+    """
+    Lexicographic searches of an undirected graph G, with ties broken by
+    a given order. S = LexSweeps(G) numbers the vertices of G, as listed
+    in S.vertices and indexed by S.index; the orders taken and returned
+    by its methods are arrays of these numbers.
+
+    Each search keeps the unvisited vertices in a doubly linked list,
+    divided into contiguous classes of vertices with equal labels and
+    initially in tie-breaking order. Visiting a vertex moves its unvisited
+    neighbors out of each class into a new class, preserving their
+    relative order; the next vertex to visit is always the first in the
+    list. Lexicographic breadth first search places the new class just
+    before the class it came from, and takes time O(n+m). Lexicographic
+    depth first search moves the new classes to the front of the list;
+    it sorts the neighbors of each vertex by their current positions,
+    and takes time O(m log n).
+    """
+
+    def __init__(self, G):
+        self.vertices = list(G)
+        self.index = {v: i for i, v in enumerate(self.vertices)}
+        self.neighbors = [[self.index[w] for w in G[v]]
+                          for v in self.vertices]
+
+    def lex_bfs(self, order=None):
+        """LexBFS order, breaking ties by choosing the earliest vertex
+        in the given order (by default, in order by number)."""
+        return self._sweep(order, False)
+
+    def lex_bfs_plus(self, previous):
+        """LexBFS+ order, breaking ties by choosing the latest vertex
+        in the previous order."""
+        return self._sweep(reversed(previous), False)
+
+    def lex_dfs(self, order=None):
+        """LexDFS order, breaking ties by choosing the earliest vertex
+        in the given order (by default, in order by number)."""
+        return self._sweep(order, True)
+
+    def lex_dfs_plus(self, previous):
+        """LexDFS+ order, breaking ties by choosing the latest vertex
+        in the previous order."""
+        return self._sweep(reversed(previous), True)
+
+    def _sweep(self, order, depth_first):
+        """Perform a single lexicographic search."""
+        n = len(self.vertices)
+        if order is None:
+            order = range(n)
+        order = array('l', order)
+        rank = array('l', [-1]) * n
+        for i in range(len(order)):
+            rank[order[i]] = i
+        if len(order) != n or -1 in rank:
+            raise ValueError("LexSweeps: not an ordering of the vertices")
+
+        # adjacency lists sorted by rank, by a bucket sort
+        adjacency = [[] for v in range(n)]
+        for v in order:
+            for w in self.neighbors[v]:
+                adjacency[w].append(v)
+
+        # linked list of unvisited vertices, and its classes
+        following = array('l', [-1]) * n
+        preceding = array('l', [-1]) * n
+        for i in range(1, n):
+            following[order[i - 1]] = order[i]
+            preceding[order[i]] = order[i - 1]
+        head = order[0] if n else -1
+        owner = array('l', [0]) * n
+        first = array('l', [head])
+        last = array('l', [order[-1] if n else -1])
+        key = array('l', [0])       # position of classes, for LexDFS
+        split = array('l', [-1])    # new class from each class, or -1
+        low = 0
+        visited = bytearray(n)
+        result = array('l')
+
+        while head >= 0:
+            v = head
+            result.append(v)
+            visited[v] = True
+            head = following[v]
+            if head >= 0:
+                preceding[head] = -1
+            c = owner[v]
+            if last[c] == v:
+                first[c] = last[c] = -1
+            else:
+                first[c] = head
+
+            S = [w for w in adjacency[v] if not visited[w]]
+            if depth_first:
+                S.sort(key=lambda w: (key[owner[w]], rank[w]))
+            touched = []
+            front = -1              # last vertex moved to the front
+            for w in S:
+                c = owner[w]
+                d = split[c]
+                if d < 0:
+                    d = split[c] = len(first)
+                    first.append(-1)
+                    last.append(-1)
+                    key.append(0)
+                    split.append(-1)
+                    touched.append(c)
+                    if depth_first:
+                        after = front
+                    else:
+                        after = preceding[first[c]]
+                else:
+                    after = last[d]
+
+                # remove w from class c and the list
+                p = preceding[w]
+                q = following[w]
+                if p >= 0:
+                    following[p] = q
+                else:
+                    head = q
+                if q >= 0:
+                    preceding[q] = p
+                if first[c] == w and last[c] == w:
+                    first[c] = last[c] = -1
+                elif first[c] == w:
+                    first[c] = q
+                elif last[c] == w:
+                    last[c] = p
+
+                # add w to the end of class d, following vertex after
+                if after >= 0:
+                    q = following[after]
+                    following[after] = w
+                else:
+                    q = head
+                    head = w
+                preceding[w] = after
+                following[w] = q
+                if q >= 0:
+                    preceding[q] = w
+                if first[d] < 0:
+                    first[d] = w
+                last[d] = w
+                owner[w] = d
+                front = w
+
+            # new classes precede all others, in the order created
+            k = len(touched)
+            for i in range(k):
+                key[split[touched[i]]] = low - k + i
+                split[touched[i]] = -1
+            low -= k
+        return result
@@ -5,7 +5,7 @@ Various operations on partial orders and directed acyclic graphs.
 D. Eppstein, July 2006.
 """
 
-from .dfs import preorder, postorder
+from .dfs import postorder
 from .bipartite_matching import matching
 
 
@@ -41,16 +41,83 @@ def isAcyclic(G):
     return isTopologicalOrder(G, L)
 
 
+def _ClosureBits(G):
+    """Compute the transitive closure of a DAG as a list of bitvectors.
+    Returns a triple (L,key,bits): L is a topological ordering, key maps
+    each vertex to its position in L, and bit j of bits[i] is set when
+    there is a nonempty path from L[i] to L[j]. We visit the vertices in
+    reverse topological order, so each vertex's bitvector can be formed
+    from those of its successors by a few word-parallel or operations.
+    """
+    L = TopologicalOrder(G)
+    key = {L[i]: i for i in range(len(L))}
+    bits = [0] * len(L)
+    for i in range(len(L) - 1, -1, -1):
+        x = 0
+        for w in G[L[i]]:
+            j = key[w]
+            x |= bits[j] | (1 << j)
+        bits[i] = x
+    return L, key, bits
+
+
+def _members(x):
+    """Generate the positions of the nonzero bits of x."""
+    while x:
+        low = x & -x
+        yield low.bit_length() - 1
+        x ^= low
+
+
+class _ClosureGraph:
+
+    """Read-only graph view of a bitvector transitive closure,
+    in which each adjacency list is decoded only when it is used."""
+
+    def __init__(self, G):
+        self._order, self._key, self._bits = _ClosureBits(G)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, v):
+        return v in self._key
+
+    def __getitem__(self, v):
+        L = self._order
+        return [L[j] for j in _members(self._bits[self._key[v]])]
+
+
 def TransitiveClosure(G):
     """
     The transitive closure of graph G.
     This is a graph on the same vertex set containing an edge (v,w)
     whenever v != w and there is a directed path from v to w in G.
     """
-    TC = {v: set(preorder(G, v)) for v in G}
-    for v in G:
-        TC[v].remove(v)
-    return TC
+    C = _ClosureGraph(G)
+    return {v: set(C[v]) for v in C}
+
+
+def TransitiveReduction(G):
+    """
+    The transitive reduction of a directed acyclic graph G.
+    This is the subgraph of G containing an edge (v,w) of G whenever
+    there is no other path from v to w; it has the same transitive
+    closure as G, and is its smallest subgraph with that property.
+    """
+    L, key, bits = _ClosureBits(G)
+    R = {}
+    for v in L:
+        covered = 0         # vertices reachable from earlier successors
+        R[v] = set()
+        for j in sorted({key[w] for w in G[v]}):
+            if not (covered >> j) & 1:
+                R[v].add(L[j])
+                covered |= bits[j]
+    return R
 
 
 def TracePaths(G):
@@ -67,11 +134,8 @@ def TracePaths(G):
         yield L
 
 
-def MinimumPathDecomposition(G):
-    """
-    Cover a directed acyclic graph with a minimum number of paths.
-    """
-    M, A, B = matching(G)
+def _MatchedPaths(G, M):
+    """Trace the paths formed by a matching M from V to U."""
     H = {v: [] for v in G}
     for v in G:
         if v in M:
@@ -79,6 +143,83 @@ def MinimumPathDecomposition(G):
     return TracePaths(H)
 
 
+def MinimumPathDecomposition(G):
+    """
+    Cover a directed acyclic graph with a minimum number of paths.
+    """
+    M, A, B = matching(G)
+    return _MatchedPaths(G, M)
+
+
+def _ClosureMatching(G):
+    """
+    Maximum matching in the transitive closure of a DAG G, viewed as a
+    bipartite graph as in bipartite_matching.matching, with output in the
+    same (M,A,B) format. Unlike matching(TransitiveClosure(G)), we never
+    construct the closure, and use only linear space.
+
+    The matching is built up in phases. In each phase we search depth
+    first for augmenting paths from each unmatched vertex of U in turn,
+    augmenting along each path we find, and we never visit a vertex of V
+    twice in the same phase, so the paths found in a phase are disjoint
+    (as in the algorithm of Pothen and Fan, "Computing the block triangular
+    form of a sparse matrix", ACM Trans. Math. Softw. 1990). The closure
+    neighbors of a vertex u of U are generated on demand by a depth first
+    search in G from u, and this search does not pass through vertices that
+    have already been visited in the same phase: their own descendants have
+    already been visited or are waiting to be visited by another search.
+    Therefore each phase takes linear time. The matching is maximum once a
+    phase finds no augmenting path, and the vertices visited by that phase
+    determine the maximum independent set.
+    """
+    TopologicalOrder(G)     # check that G is acyclic
+
+    # initialize greedy matching using the edges of G
+    matching = {}
+    for u in G:
+        for v in G[u]:
+            if v not in matching:
+                matching[v] = u
+                break
+
+    while True:
+        matched = {matching[v] for v in matching}
+        visited = set()     # vertices of V reached in this phase
+        augmented = False
+        for root in G:
+            if root in matched:
+                continue
+            # stack of [u, vertices still to search from u, v matched to u]
+            stack = [[root, list(G[root]), None]]
+            while stack:
+                frame = stack[-1]
+                pending = frame[1]
+                while pending:
+                    v = pending.pop()
+                    if v not in visited:
+                        visited.add(v)
+                        pending.extend(G[v])
+                        break
+                else:
+                    stack.pop()
+                    continue
+                if v in matching:
+                    stack.append([matching[v], list(G[matching[v]]), v])
+                    continue
+                # found augmenting path, rematch along it
+                for u, pending, w in reversed(stack):
+                    matching[v] = u
+                    v = w
+                matched.add(root)
+                augmented = True
+                break
+
+        if not augmented:
+            reached = [v for v in G if v not in matched]
+            reached += [matching[v] for v in visited if v in matching]
+            return (matching, reached, [v for v in G if v not in visited])
+
+
 def MinimumChainDecomposition(G):
     """
     Cover a partial order with a minimum number of chains.
@@ -86,14 +227,16 @@ def MinimumChainDecomposition(G):
     of the largest antichain of the order. The input should be
     a directed acyclic graph, not necessarily transitively closed.
     """
-    return MinimumPathDecomposition(TransitiveClosure(G))
+    M, A, B = _ClosureMatching(G)
+    return _MatchedPaths(G, M)
 
 
 def MaximumAntichain(G):
     """
     Find a maximum antichain in the given directed acyclic graph.
     """
-    if not isAcyclic(G):
+    try:
+        M, A, B = _ClosureMatching(G)
+    except ValueError:
         raise ValueError("MaximumAntichain: input is not acyclic.")
-    M, A, B = matching(TransitiveClosure(G))
     return set(A).intersection(B)
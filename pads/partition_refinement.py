@@ -5,8 +5,19 @@ as used e.g. in Hopcroft's DFA minimization algorithm,
 modular decomposition of graphs, etc.
 
 D. Eppstein, November 2003.
+
+IntegerPartitionRefinement partitions the integers range(n) using the
+usual permutation-array representation: the items are stored in an array
+in which each set occupies a contiguous range of positions, and a
+refinement moves the items of its argument to the front of their sets
+by swaps. Sets are represented by integers rather than Python sets, and
+no memory is allocated except for the newly created sets.
+ArrayPartitionRefinement wraps it with the same interface as
+PartitionRefinement, for arbitrary hashable items.
 """
 
+from array import array
+
 
 class PartitionError(Exception):
     pass
@@ -89,3 +100,248 @@ class PartitionRefinement:
                 self._partition[x] = F
             self._sets[id(F)] = F
             del self._sets[id(S)]
+
+
+class IntegerPartitionRefinement:
+
+    """Maintain and refine a partition of range(n) into subsets.
+    The subsets are numbered consecutively from zero, in order of creation,
+    and P[x] gives the number of the subset containing x, or -1 if x has
+    been removed. The items of each subset occupy the positions
+    P.start[c] to P.end[c]-1 of the array P.element, and P.position[x]
+    gives the position of x in that array.
+    Each refine operation takes time proportional to the size of its
+    argument, and each remove operation takes constant time.
+    """
+
+    def __init__(self, n):
+        """Create a new partition of range(n), with all items in set 0."""
+        self.element = array('l', range(n))
+        self.position = array('l', range(n))
+        self._owner = array('l', [0]) * n
+        self.start = array('l', [0])
+        self.end = array('l', [n])
+        self._marked = array('l', [0])
+
+    def __getitem__(self, x):
+        """Return the number of the set that contains x."""
+        return self._owner[x]
+
+    def __iter__(self):
+        """Loop through the numbers of the sets in the partition."""
+        return iter(range(len(self.start)))
+
+    def __len__(self):
+        """Return the number of sets in the partition."""
+        return len(self.start)
+
+    def size(self, c):
+        """Return the number of items in set c."""
+        return self.end[c] - self.start[c]
+
+    def members(self, c):
+        """Return an array of the items in set c."""
+        return self.element[self.start[c]:self.end[c]]
+
+    def _swap(self, x, i):
+        """Exchange the positions of x and the item at position i."""
+        element = self.element
+        position = self.position
+        y = element[i]
+        j = position[x]
+        element[i] = x
+        element[j] = y
+        position[x] = i
+        position[y] = j
+
+    def add(self, x, c):
+        """Add x to the end of set c. The item x must either have been
+        removed or be the next unused integer, len(self.position), in
+        which case the partition grows to include it. The items after
+        the end of set c shift one position, so this takes linear time.
+        """
+        if x == len(self.position):
+            self.position.append(len(self.element))
+            self.element.append(x)
+            self._owner.append(-1)
+        elif not 0 <= x < len(self.position) or self._owner[x] >= 0:
+            raise PartitionError("Element already belongs to the partition")
+        start = self.start
+        end = self.end
+
+        # take x out of the array; it lies outside every set's range
+        i = self.position[x]
+        del self.element[i]
+        for d in range(len(start)):
+            if start[d] > i:
+                start[d] -= 1
+            if end[d] > i:
+                end[d] -= 1
+
+        # and put it back at the end of set c
+        j = end[c]
+        self.element.insert(j, x)
+        for d in range(len(start)):
+            if d != c and start[d] >= j:
+                start[d] += 1
+                end[d] += 1
+        end[c] += 1
+        for k in range(min(i, j), max(i, j) + 1):
+            self.position[self.element[k]] = k
+        self._owner[x] = c
+
+    def remove(self, x):
+        """Remove x from its set, by moving it before the set's start."""
+        c = self._owner[x]
+        if c < 0:
+            raise PartitionError("Element does not belong to the partition")
+        self._swap(x, self.start[c])
+        self.start[c] += 1
+        self._owner[x] = -1
+
+    def refine(self, S):
+        """Refine each set A in the partition to the two sets
+        A & S, A - S.  Return a list of pairs (A & S, A - S)
+        for each changed set, as set numbers. Within each pair, A & S
+        is a new set, placed just before A - S in the element array,
+        while A - S keeps the number of A.
+        """
+        owner = self._owner
+        element = self.element
+        position = self.position
+        start = self.start
+        marked = self._marked
+        touched = []
+        for x in S:
+            c = owner[x]
+            if c < 0:
+                continue        # removed
+            i = start[c] + marked[c]
+            j = position[x]
+            if j < i:
+                continue        # repeated in S
+            if i == start[c]:
+                touched.append(c)
+            y = element[i]
+            element[i] = x
+            element[j] = y
+            position[x] = i
+            position[y] = j
+            marked[c] += 1
+        output = []
+        for c in touched:
+            m = marked[c]
+            marked[c] = 0
+            if m == self.end[c] - start[c]:
+                continue
+            d = len(start)
+            start.append(start[c])
+            self.end.append(start[c] + m)
+            marked.append(0)
+            start[c] += m
+            for i in range(start[d], start[c]):
+                owner[self.element[i]] = d
+            output.append((d, c))
+        return output
+
+
+class _ArraySet:
+
+    """One set of an ArrayPartitionRefinement, viewed as a collection.
+    Its identity stays fixed as its contents change, so it may be used
+    with Sequence(key=id) just like the sets of PartitionRefinement.
+    """
+
+    __slots__ = ('_partition', '_number')
+
+    def __init__(self, partition, number):
+        self._partition = partition
+        self._number = number
+
+    def __len__(self):
+        return self._partition._P.size(self._number)
+
+    def __iter__(self):
+        items = self._partition._items
+        for x in self._partition._P.members(self._number):
+            yield items[x]
+
+    def __contains__(self, item):
+        P = self._partition
+        return item in P._index and P._P[P._index[item]] == self._number
+
+
+class ArrayPartitionRefinement:
+
+    """Maintain and refine a partition of a set of items into subsets,
+    with the same interface as PartitionRefinement, by numbering the
+    items and using an IntegerPartitionRefinement. The sets are views,
+    not Python sets; the add operation takes linear time.
+    """
+
+    def __init__(self, items):
+        """Create a new partition refinement data structure for the given
+        items.  Initially, all items belong to the same subset.
+        """
+        self._items = list(dict.fromkeys(items))
+        self._index = {x: i for i, x in enumerate(self._items)}
+        self._P = IntegerPartitionRefinement(len(self._items))
+        self._sets = [_ArraySet(self, 0)]
+        self._frozen = None
+
+    def __getitem__(self, element):
+        """Return the set that contains the given element."""
+        c = self._P[self._index[element]]
+        if c < 0:
+            raise KeyError(element)
+        if self._frozen is not None:
+            return self._frozen[c]
+        return self._sets[c]
+
+    def __iter__(self):
+        """Loop through the sets in the partition."""
+        if self._frozen is not None:
+            return iter(self._frozen)
+        return iter(self._sets)
+
+    def __len__(self):
+        """Return the number of sets in the partition."""
+        return len(self._sets)
+
+    def _number(self, theset):
+        """The number of a set of the partition."""
+        if not isinstance(theset, _ArraySet) or theset._partition is not self:
+            raise PartitionError("Set does not belong to the partition")
+        return theset._number
+
+    def add(self, element, theset):
+        """Add a new element to the given partition subset."""
+        c = self._number(theset)
+        if element in self._index and self._P[self._index[element]] >= 0:
+            raise PartitionError("Element already belongs to the partition")
+        if element not in self._index:
+            self._index[element] = len(self._items)
+            self._items.append(element)
+        self._P.add(self._index[element], c)
+
+    def remove(self, element):
+        """Remove the given element from its partition subset."""
+        self._P.remove(self._index[element])
+
+    def refine(self, S):
+        """Refine each set A in the partition to the two sets
+        A & S, A - S.  Return a list of pairs (A & S, A - S)
+        for each changed set, as in PartitionRefinement.refine.
+        """
+        if self._frozen is not None:
+            raise PartitionError("Partition has been frozen")
+        index = self._index
+        output = []
+        for new, old in self._P.refine(index[x] for x in S if x in index):
+            self._sets.append(_ArraySet(self, new))
+            output.append((self._sets[new], self._sets[old]))
+        return output
+
+    def freeze(self):
+        """Make all sets in S immutable."""
+        self._frozen = [frozenset(S) for S in self._sets]
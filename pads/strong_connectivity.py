@@ -9,10 +9,15 @@ If G is a graph, then
   vertices of which are strongly connected components of G.
   Each vertex of the condensation is represented as a frozenset
   of the vertices of G within a single strongly connected component.
+- ComponentNumbers(offsets, targets) numbers the components of a graph
+  on the integers 0..n-1, given in compressed sparse row form, without
+  building any subgraphs.
 
 D. Eppstein, July 2005.
 """
 
+from array import array
+
 from .dfs import Searcher
 
 
@@ -97,3 +102,55 @@ def Condensation(G):
             if GtoC[v] != GtoC[w]:
                 components[GtoC[v]].add(GtoC[w])
     return components
+
+
+def ComponentNumbers(offsets, targets):
+    """Number the strongly connected components of an integer graph.
+    The graph has vertices 0..n-1, where n = len(offsets) - 1, and
+    the neighbors of v are targets[offsets[v]:offsets[v+1]].
+    Returns a pair (count, component) where component is an array
+    mapping each vertex to the number of its component.  We use
+    Tarjan's algorithm, with an explicit stack in place of recursion;
+    it finds the components in reverse topological order, so every
+    edge goes from a component to one with an equal or smaller number.
+    """
+    n = len(offsets) - 1
+    dfsnumber = array('l', [-1]) * n
+    low = array('l', [0]) * n
+    component = array('l', [-1]) * n
+    nextedge = array('l', offsets[:n])
+    active = []     # vertices visited but not yet assigned to components
+    count = 0
+    visited = 0
+    for root in range(n):
+        if dfsnumber[root] >= 0:
+            continue
+        dfsnumber[root] = low[root] = visited
+        visited += 1
+        active.append(root)
+        path = [root]
+        while path:
+            v = path[-1]
+            i = nextedge[v]
+            if i < offsets[v + 1]:
+                nextedge[v] = i + 1
+                w = targets[i]
+                if dfsnumber[w] < 0:
+                    dfsnumber[w] = low[w] = visited
+                    visited += 1
+                    active.append(w)
+                    path.append(w)
+                elif component[w] < 0 and dfsnumber[w] < low[v]:
+                    low[v] = dfsnumber[w]
+                continue
+            path.pop()
+            if low[v] == dfsnumber[v]:
+                while True:
+                    w = active.pop()
+                    component[w] = count
+                    if w == v:
+                        break
+                count += 1
+            if path and low[v] < low[path[-1]]:
+                low[path[-1]] = low[v]
+    return count, component
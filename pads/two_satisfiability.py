@@ -25,16 +25,34 @@ If G is a graph of this type,
   values that they are forced to hold in any satisfying assignment.
   The empty dictionary is returned if all variables are free to take either
   truth value, and None is returned if the instance is unsatisfiable.
-  Because this uses a reachability algorithm in directed acyclic graphs,
-  it is not truly linear time but is still polynomial.
+- ForcedChains(G) maps each forced variable to a chain of implications
+  from the opposite of its forced value to its negation, justifying it.
+  Forced values are found by searching for paths from each literal to its
+  negation, limited to the components that lie between the two in the
+  topological order and cut short at literals already known to fail.
+  This uses only linear space, and is typically fast, but may take
+  quadratic time in the worst case: finding the forced values of a
+  2SAT instance is as hard as answering many reachability queries in a
+  directed acyclic graph, for which no linear time algorithm is known.
+
+For large instances, the functions ClausesSatisfiable, SatisfyingAssignment,
+ForcedLiterals, and ForcedImplications solve the same problems for a more
+compact representation, in which the variables are the integers 0..n-1,
+the literals are integers 2i (representing variable i) and 2i+1
+(representing its negation), so that x^1 is the negation of literal x,
+and the instance is a sequence of clauses, each a pair (x,y) of literals
+at least one of which must be true. The implication graph is then stored
+in arrays rather than dictionaries.
+Satisfiable and Forced work by translating their inputs into this form.
 
 D. Eppstein, April 2009.
 """
 
+from array import array
+
 from ._not import Not, SymbolicNegation
 from .graphs import copy_graph
-from .strong_connectivity import Condensation
-from .acyclic_reachability import Reachability
+from .strong_connectivity import ComponentNumbers
 
 
 def Symmetrize(G):
@@ -59,14 +77,188 @@ def Symmetrize(G):
     return H
 
 
+def _ImplicationGraph(nvariables, clauses):
+    """Build the implication graph of a sequence of integer clauses.
+    Each clause (x,y) produces the two implications ~x => y and ~y => x.
+    The graph is returned in the compressed sparse row form used by
+    StrongConnectivity.ComponentNumbers.
+    """
+    n = 2 * nvariables
+    offsets = array('l', [0]) * (n + 1)
+    for x, y in clauses:
+        if not (0 <= x < n and 0 <= y < n):
+            raise ValueError("Literal out of range in clause " +
+                             repr((x, y)))
+        offsets[x ^ 1] += 1
+        offsets[y ^ 1] += 1
+    total = 0
+    for v in range(n + 1):
+        total += offsets[v]
+        offsets[v] = total      # end of v's range, moved to start below
+    targets = array('l', [0]) * total
+    for x, y in clauses:
+        offsets[x ^ 1] -= 1
+        targets[offsets[x ^ 1]] = y
+        offsets[y ^ 1] -= 1
+        targets[offsets[y ^ 1]] = x
+    return offsets, targets
+
+
+def _Encode(G):
+    """Translate an implication graph into integer clauses.
+    Returns a pair (variables, clauses) where variables lists
+    the variables of G in the order of their integer numbers.
+    """
+    number = {}
+    variables = []
+
+    def literal(x):
+        negated = isinstance(x, SymbolicNegation)
+        if negated:
+            x = x.negate()
+        if x not in number:
+            number[x] = len(variables)
+            variables.append(x)
+        return 2 * number[x] + negated
+
+    clauses = []
+    for v in G:
+        x = literal(v)
+        for w in G[v]:
+            clauses.append((x ^ 1, literal(w)))     # v => w iff ~v or w
+    return variables, clauses
+
+
+def _Components(nvariables, clauses):
+    """Strongly connected components of the implication graph,
+    or None if some literal and its negation share a component."""
+    offsets, targets = _ImplicationGraph(nvariables, clauses)
+    count, component = ComponentNumbers(offsets, targets)
+    for i in range(nvariables):
+        if component[2 * i] == component[2 * i + 1]:
+            return None
+    return offsets, targets, count, component
+
+
+def ClausesSatisfiable(nvariables, clauses):
+    """Can the integer clauses all be satisfied simultaneously?"""
+    return _Components(nvariables, clauses) is not None
+
+
+def SatisfyingAssignment(nvariables, clauses):
+    """Find a list of truth values satisfying all the integer clauses,
+    or None if no satisfying assignment exists. Because the components
+    are numbered in reverse topological order, setting each literal true
+    when its component comes later in that order than its negation's
+    does not allow any true literal to imply a false one.
+    """
+    C = _Components(nvariables, clauses)
+    if C is None:
+        return None
+    component = C[3]
+    return [component[2 * i] < component[2 * i + 1]
+            for i in range(nvariables)]
+
+
+def _FailedLiterals(nvariables, clauses):
+    """Find the literals that imply their own negations.
+    Returns None for unsatisfiable clauses, and otherwise a dictionary
+    mapping each such literal x to a pair (path, y): path is a sequence
+    of implications from x to y, and either y is None and the path ends
+    at the negation of x, or y is another failed literal. In the latter
+    case x implies y implies ~y implies ~x, where the last step is the
+    contrapositive of the path.
+
+    We test the literals in order by component number, so that every
+    failed literal reachable from x is known before we search from x.
+    The search stops at components numbered below that of ~x, as they
+    follow ~x in the topological order and cannot lead back to it.
+    """
+    C = _Components(nvariables, clauses)
+    if C is None:
+        return None
+    offsets, targets, count, component = C
+    n = 2 * nvariables
+    bycomponent = [[] for c in range(count)]
+    for x in range(n):
+        bycomponent[component[x]].append(x)
+    failed = {}
+    parent = array('l', [-1]) * n
+    searched = array('l', [-1]) * n     # last search to reach each literal
+
+    for x in (x for literals in bycomponent for x in literals):
+        negation = x ^ 1
+        bound = component[negation]
+        if bound >= component[x]:
+            continue        # x comes after ~x, can't imply it
+        searched[x] = x
+        stack = [x]
+        found = None
+        while stack and found is None:
+            v = stack.pop()
+            for i in range(offsets[v], offsets[v + 1]):
+                w = targets[i]
+                if searched[w] == x or component[w] < bound:
+                    continue
+                searched[w] = x
+                parent[w] = v
+                if w == negation or w in failed:
+                    found = w
+                    break
+                stack.append(w)
+        if found is not None:
+            path = [found]
+            while path[-1] != x:
+                path.append(parent[path[-1]])
+            path.reverse()
+            failed[x] = (path, None if found == negation else found)
+    return failed
+
+
+def ForcedLiterals(nvariables, clauses):
+    """Find forced values for variables of integer clauses.
+    Returns a dictionary mapping each forced variable number
+    to its value, or None if the clauses are unsatisfiable.
+    """
+    failed = _FailedLiterals(nvariables, clauses)
+    if failed is None:
+        return None
+    return {x >> 1: x & 1 == 1 for x in failed}
+
+
+def ForcedImplications(nvariables, clauses):
+    """Justify the forced values of variables of integer clauses.
+    Returns a dictionary mapping each forced variable number to a list
+    of literals, starting with the literal that would give the variable
+    the opposite of its forced value and ending with that literal's
+    negation, in which each literal implies the next by a single clause.
+    Returns None if the clauses are unsatisfiable.
+    """
+    failed = _FailedLiterals(nvariables, clauses)
+    if failed is None:
+        return None
+    chains = {}
+    for x in failed:
+        chain = []
+        returns = []
+        y = x
+        while True:
+            path, y = failed[y]
+            if y is None:
+                chain += path
+                break
+            chain += path[:-1]
+            returns.append([v ^ 1 for v in reversed(path[:-1])])
+        for path in reversed(returns):
+            chain += path
+        chains[x >> 1] = chain
+    return chains
+
+
 def Satisfiable(G):
     """Does this 2SAT instance have a satisfying assignment?"""
-    G = Condensation(Symmetrize(G))
-    for C in G:
-        for v in C:
-            if Not(v) in C:
-                return False
-    return True
+    variables, clauses = _Encode(G)
+    return ClausesSatisfiable(len(variables), clauses)
 
 
 def Forced(G):
@@ -78,21 +270,27 @@ def Forced(G):
     and their values are the values they are forced to.
 
     If the given instance is unsatisfiable, we return None."""
-    Force = {}
-    Sym = Symmetrize(G)
-    Con = Condensation(Sym)
-    Map = {}
-    for SCC in Con:
-        for v in SCC:
-            Map[v] = SCC
-    Reach = Reachability(Con)
-    for v in Sym:
-        if Reach.reachable(Map[v], Map[Not(v)]):  # v implies not v?
-            value = False
-            if isinstance(v, SymbolicNegation):
-                v = Not(v)
-                value = True
-            if v in Force:  # already added by negation?
-                return None
-            Force[v] = value
-    return Force
+    variables, clauses = _Encode(G)
+    forced = ForcedLiterals(len(variables), clauses)
+    if forced is None:
+        return None
+    return {variables[i]: forced[i] for i in forced}
+
+
+def ForcedChains(G):
+    """Justify the forced values of variables in a 2SAT instance.
+    The result maps each forced variable v to a list of literals
+    of G, each implying the next, that starts with the literal
+    contradicting the forced value (v or Not(v)) and ends with
+    its negation. Returns None if the instance is unsatisfiable.
+    """
+    variables, clauses = _Encode(G)
+    chains = ForcedImplications(len(variables), clauses)
+    if chains is None:
+        return None
+
+    def decode(x):
+        v = variables[x >> 1]
+        return Not(v) if x & 1 else v
+
+    return {variables[i]: [decode(x) for x in chains[i]] for i in chains}
@@ -0,0 +1,560 @@
+"""WeightedMatching.py
+
+Maximum weight matchings in general undirected graphs.
+
+The graph format is the same as for MinimumSpanningTree: iter(G) lists
+the vertices, iter(G[v]) lists the neighbors of v, and G[v][w] == G[w][v]
+gives the weight of edge v,w. The output, as for CardinalityMatching, is
+a dictionary mapping matched vertices to their partners.
+
+max_weight_matching uses Edmonds' weighted blossom algorithm in its
+primal-dual form, as described in Galil's 1986 Computing Surveys paper,
+with the bookkeeping of least-slack edges per blossom that makes each of
+its O(n) stages take O(n^2) time. approximate_weight_matching finds a
+matching within a factor of 1 - eps of optimal, much more quickly for
+large graphs of small degree, by starting from a greedy matching and
+applying short augmentations until none of them helps by more than a
+small threshold, in the style of Pettie and Sanders, "A simpler linear
+time 2/3 - epsilon approximation for maximum weight matching", IPL 2004.
+"""
+
+import math
+
+from .graphs import is_undirected
+
+
+def _Edges(G):
+    """
+    Check that G is a weighted undirected graph and number its vertices.
+    Returns a triple (vertices, edges, neighbors) where edges is a list
+    of triples (i, j, weight) of vertex numbers and neighbors[i] lists
+    the endpoint numbers p, with edge p // 2 and far endpoint
+    edges[p // 2][p & 1], of the edges incident to vertex number i.
+    """
+    if not is_undirected(G):
+        raise ValueError("weighted matching: input is not undirected")
+    vertices = list(G)
+    index = {v: i for i, v in enumerate(vertices)}
+    edges = []
+    neighbors = [[] for v in vertices]
+    for v in G:
+        for w in G[v]:
+            if G[v][w] != G[w][v]:
+                raise ValueError("weighted matching: asymmetric weights")
+            i, j = index[v], index[w]
+            if i < j:
+                neighbors[i].append(2 * len(edges) + 1)
+                neighbors[j].append(2 * len(edges))
+                edges.append((i, j, G[v][w]))
+    return vertices, edges, neighbors
+
+
+def max_weight_matching(G):
+    """
+    Find a matching of maximum total weight in the graph G.
+    Edges of zero or negative weight are never used.
+    Integer weights give exact results; the dual variables of the
+    algorithm stay integers because all of its changes are by
+    half-integer amounts applied to doubled values.
+    """
+    vertices, edges, neighbors = _Edges(G)
+    n = len(vertices)
+    if not edges:
+        return {}
+
+    # endpoint[p] is the vertex at endpoint p; endpoints 2k and 2k+1
+    # belong to edge k, and p ^ 1 is the other end of the same edge
+    endpoint = [edges[p // 2][p & 1] for p in range(2 * len(edges))]
+
+    # We keep our own arrays rather than using UnionFind for the blossom
+    # containing each vertex, because blossoms are split apart again when
+    # they are expanded and UnionFind can only merge sets. Similarly, the
+    # O(nm log n) form of the algorithm keeps the least-slack edges of each
+    # blossom in a priority queue that must be split and concatenated
+    # along with the blossoms, with keys that all shift together when the
+    # duals change; the heaps in this library (IntegerHeap, BucketQueue)
+    # support neither, so we use the simpler O(n^3) bookkeeping below.
+    #
+    # Data structures, for vertices 0..n-1 and blossoms n..2n-1:
+    #
+    # mate[v]: remote endpoint of the matched edge at vertex v, or -1
+    #
+    # label[b]: 0 if top-level blossom b is unlabeled, 1 for S, 2 for T;
+    # also set on single vertices inside T-blossoms, for use when those
+    # blossoms are expanded
+    #
+    # labelend[b]: endpoint through which b got its label, or -1 for
+    # the roots of the alternating trees
+    #
+    # inblossom[v]: the top-level blossom containing vertex v
+    #
+    # parent[b], childs[b], endps[b], base[b]: the blossom containing b,
+    # the sub-blossoms of b in cyclic order starting at the base, the
+    # endpoints of the edges connecting consecutive sub-blossoms, and
+    # the base vertex of b
+    #
+    # bestedge[b]: least-slack edge from b to a different S-blossom,
+    # or from a free vertex b to an S-blossom; -1 if none
+    #
+    # blossombestedges[b]: for S-blossoms, a list of least-slack edges
+    # to each other S-blossom, or None if not computed
+    #
+    # dual[v], dual[b]: dual variables, doubled for vertices so that
+    # every change stays integral for integer weights
+    maxweight = max(0, max(w for i, j, w in edges))
+    mate = [-1] * n
+    label = [0] * (2 * n)
+    labelend = [-1] * (2 * n)
+    inblossom = list(range(n))
+    parent = [-1] * (2 * n)
+    childs = [None] * (2 * n)
+    endps = [None] * (2 * n)
+    base = list(range(n)) + [-1] * n
+    bestedge = [-1] * (2 * n)
+    blossombestedges = [None] * (2 * n)
+    unused = list(range(n, 2 * n))
+    dual = [maxweight] * n + [0] * n
+    allowedge = []
+    queue = []
+
+    def slack(k):
+        """Twice the amount by which edge k fails to be tight."""
+        i, j, w = edges[k]
+        return dual[i] + dual[j] - 2 * w
+
+    def leaves(b):
+        """List the vertices in blossom b."""
+        if b < n:
+            return [b]
+        result = []
+        stack = [b]
+        while stack:
+            b = stack.pop()
+            if b < n:
+                result.append(b)
+            else:
+                stack.extend(childs[b])
+        return result
+
+    def assign_label(w, t, p):
+        """Label the top-level blossom containing w with t via endpoint p,
+        and give the blossom matched to a new T-blossom an S label.
+        """
+        while True:
+            b = inblossom[w]
+            label[w] = label[b] = t
+            labelend[w] = labelend[b] = p
+            bestedge[w] = bestedge[b] = -1
+            if t == 1:
+                queue.extend(leaves(b))
+                return
+            p = mate[base[b]]
+            w = endpoint[p]
+            t = 1
+            p ^= 1
+
+    def scan_blossom(v, w):
+        """Trace back from the ends of S-S edge v,w to find the base
+        of the new blossom it forms, or -1 for an augmenting path.
+        """
+        path = []
+        found = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] & 4:
+                found = base[b]
+                break
+            path.append(b)
+            label[b] = 5        # breadcrumb, still an S-blossom
+            if labelend[b] == -1:
+                v = -1          # reached a root
+            else:
+                v = endpoint[labelend[b]]
+                v = endpoint[labelend[inblossom[v]]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return found
+
+    def add_blossom(vertex, k):
+        """Create a new blossom with the given base, from edge k."""
+        v, w, weight = edges[k]
+        bb = inblossom[vertex]
+        bv = inblossom[v]
+        bw = inblossom[w]
+        b = unused.pop()
+        base[b] = vertex
+        parent[b] = -1
+        parent[bb] = b
+        path = []
+        ends = []
+        while bv != bb:
+            parent[bv] = b
+            path.append(bv)
+            ends.append(labelend[bv])
+            bv = inblossom[endpoint[labelend[bv]]]
+        path.append(bb)
+        path.reverse()
+        ends.reverse()
+        ends.append(2 * k)
+        while bw != bb:
+            parent[bw] = b
+            path.append(bw)
+            ends.append(labelend[bw] ^ 1)
+            bw = inblossom[endpoint[labelend[bw]]]
+        childs[b] = path
+        endps[b] = ends
+        label[b] = 1
+        labelend[b] = labelend[bb]
+        dual[b] = 0
+        for v in leaves(b):
+            if label[inblossom[v]] == 2:
+                queue.append(v)     # former T-vertices become S-vertices
+            inblossom[v] = b
+
+        # find the least-slack edges from the new blossom to other
+        # S-blossoms, using those already known for its sub-blossoms
+        bestto = {}
+        for bv in path:
+            if blossombestedges[bv] is None:
+                candidates = [p // 2 for v in leaves(bv) for p in neighbors[v]]
+            else:
+                candidates = blossombestedges[bv]
+            for k in candidates:
+                i, j, weight = edges[k]
+                if inblossom[j] == b:
+                    i, j = j, i
+                bj = inblossom[j]
+                if bj != b and label[bj] == 1 and \
+                        (bj not in bestto or slack(k) < slack(bestto[bj])):
+                    bestto[bj] = k
+            blossombestedges[bv] = None
+            bestedge[bv] = -1
+        blossombestedges[b] = list(bestto.values())
+        bestedge[b] = min(blossombestedges[b], key=slack, default=-1)
+
+    def expand_blossom(b, endstage):
+        """Replace top-level blossom b by its sub-blossoms, relabeling
+        them if b is a T-blossom in the middle of a stage.
+        """
+        for s in childs[b]:
+            parent[s] = -1
+            if s < n:
+                inblossom[s] = s
+            elif endstage and dual[s] == 0:
+                expand_blossom(s, endstage)
+            else:
+                for v in leaves(s):
+                    inblossom[v] = s
+
+        if not endstage and label[b] == 2:
+            # The sub-blossoms on the even-length side of the cycle, from
+            # the one through which b was labeled back to the base, become
+            # alternately T and S; the rest lose their labels, except that
+            # any of their vertices reached by the search become T again.
+            sub = childs[b]
+            entry = inblossom[endpoint[labelend[b] ^ 1]]
+            j = sub.index(entry)
+            if j & 1:
+                j -= len(sub)
+                step, trick = 1, 0
+            else:
+                step, trick = -1, 1
+            p = labelend[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[endps[b][j - trick] ^ trick ^ 1]] = 0
+                assign_label(endpoint[p ^ 1], 2, p)
+                allowedge[endps[b][j - trick] // 2] = True
+                j += step
+                p = endps[b][j - trick] ^ trick
+                allowedge[p // 2] = True
+                j += step
+            bv = sub[j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            labelend[endpoint[p ^ 1]] = labelend[bv] = p
+            bestedge[bv] = -1
+            j += step
+            while sub[j] != entry:
+                bv = sub[j]
+                j += step
+                if label[bv] == 1:
+                    continue    # already labeled by the loop above
+                for v in leaves(bv):
+                    if label[v] != 0:
+                        label[v] = 0
+                        label[endpoint[mate[base[bv]]]] = 0
+                        assign_label(v, 2, labelend[v])
+                        break
+
+        label[b] = labelend[b] = -1
+        childs[b] = endps[b] = None
+        base[b] = -1
+        blossombestedges[b] = None
+        bestedge[b] = -1
+        unused.append(b)
+
+    def augment_blossom(b, v):
+        """Swap matched and unmatched edges within blossom b along the
+        path from vertex v to the base, making v the new base.
+        """
+        t = v
+        while parent[t] != b:
+            t = parent[t]
+        if t >= n:
+            augment_blossom(t, v)
+        sub = childs[b]
+        i = j = sub.index(t)
+        if i & 1:
+            j -= len(sub)
+            step, trick = 1, 0
+        else:
+            step, trick = -1, 1
+        while j != 0:
+            j += step
+            t = sub[j]
+            p = endps[b][j - trick] ^ trick
+            if t >= n:
+                augment_blossom(t, endpoint[p])
+            j += step
+            t = sub[j]
+            if t >= n:
+                augment_blossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        childs[b] = sub[i:] + sub[:i]
+        endps[b] = endps[b][i:] + endps[b][:i]
+        base[b] = base[childs[b][0]]
+
+    def augment_matching(k):
+        """Augment along the path through S-S edge k between two trees."""
+        v, w, weight = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= n:
+                    augment_blossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    break       # reached a root
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= n:
+                    augment_blossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+
+    # Each stage grows alternating trees from all free vertices and either
+    # augments the matching or proves that no augmentation can help.
+    for stage in range(n):
+        label[:] = [0] * (2 * n)
+        bestedge[:] = [-1] * (2 * n)
+        for b in range(n, 2 * n):
+            blossombestedges[b] = None
+        allowedge[:] = [False] * len(edges)
+        queue[:] = []
+        for v in range(n):
+            if mate[v] == -1 and label[inblossom[v]] == 0:
+                assign_label(v, 1, -1)
+
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbors[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if inblossom[v] == inblossom[w]:
+                        continue    # edge internal to a blossom
+                    if not allowedge[k]:
+                        kslack = slack(k)
+                        if kslack <= 0:
+                            allowedge[k] = True
+                    if allowedge[k]:
+                        if label[inblossom[w]] == 0:
+                            assign_label(w, 2, p ^ 1)
+                        elif label[inblossom[w]] == 1:
+                            b = scan_blossom(v, w)
+                            if b >= 0:
+                                add_blossom(b, k)
+                            else:
+                                augment_matching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            label[w] = 2    # inside a T-blossom
+                            labelend[w] = p ^ 1
+                    elif label[inblossom[w]] == 1:
+                        b = inblossom[v]
+                        if bestedge[b] == -1 or kslack < slack(bestedge[b]):
+                            bestedge[b] = k
+                    elif label[w] == 0:
+                        if bestedge[w] == -1 or kslack < slack(bestedge[w]):
+                            bestedge[w] = k
+            if augmented:
+                break
+
+            # No tight edge to follow; change the duals by the largest
+            # amount that keeps them feasible. The four limits are the
+            # smallest S-vertex dual (at which point we are done), the
+            # least slack from an S-vertex to a free vertex, half the least
+            # slack between S-blossoms, and the smallest T-blossom dual.
+            deltatype = 1
+            delta = min(dual[:n])
+            deltaedge = deltablossom = -1
+            for v in range(n):
+                if label[inblossom[v]] == 0 and bestedge[v] != -1:
+                    d = slack(bestedge[v])
+                    if d < delta:
+                        delta, deltatype, deltaedge = d, 2, bestedge[v]
+            for b in range(2 * n):
+                if parent[b] == -1 and label[b] == 1 and bestedge[b] != -1:
+                    d = slack(bestedge[b])
+                    d = d // 2 if isinstance(d, int) else d / 2
+                    if d < delta:
+                        delta, deltatype, deltaedge = d, 3, bestedge[b]
+            for b in range(n, 2 * n):
+                if base[b] >= 0 and parent[b] == -1 and label[b] == 2 \
+                        and dual[b] < delta:
+                    delta, deltatype, deltablossom = dual[b], 4, b
+
+            for v in range(n):
+                if label[inblossom[v]] == 1:
+                    dual[v] -= delta
+                elif label[inblossom[v]] == 2:
+                    dual[v] += delta
+            for b in range(n, 2 * n):
+                if base[b] >= 0 and parent[b] == -1:
+                    if label[b] == 1:
+                        dual[b] += delta
+                    elif label[b] == 2:
+                        dual[b] -= delta
+
+            if deltatype == 1:
+                break       # optimum reached
+            elif deltatype == 2:
+                allowedge[deltaedge] = True
+                i, j, weight = edges[deltaedge]
+                if label[inblossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif deltatype == 3:
+                allowedge[deltaedge] = True
+                queue.append(edges[deltaedge][0])
+            else:
+                expand_blossom(deltablossom, False)
+
+        if not augmented:
+            break
+
+        # expand S-blossoms whose duals have dropped to zero
+        for b in range(n, 2 * n):
+            if parent[b] == -1 and base[b] >= 0 and label[b] == 1 \
+                    and dual[b] == 0:
+                expand_blossom(b, True)
+
+    return {vertices[v]: vertices[endpoint[mate[v]]]
+            for v in range(n) if mate[v] >= 0 and edges[mate[v] // 2][2] > 0}
+
+
+def approximate_weight_matching(G, eps=0.25):
+    """
+    Find a matching in the graph G whose total weight is at least 1 - eps
+    times the maximum, for 0 < eps < 1.
+
+    We start from the greedy matching and repeatedly apply the best short
+    augmentation found from each vertex in turn, until none gains more
+    than delta = eps W / (k n), where W is the largest edge weight. An
+    augmentation is an alternating path or cycle that adds k or fewer
+    unmatched edges and drops the matched edges at their endpoints, for
+    k = ceil(1/eps - 1/2). Cutting the symmetric difference of the final
+    matching M with a maximum matching into windows of k consecutive
+    added edges puts each edge of the maximum matching into k windows and
+    each edge of M into at most k + 1, and there are at most k n / 2
+    windows, each gaining at most delta; so k OPT <= (k + 1) w(M) + eps W / 2,
+    from which the bound follows.
+
+    Each search takes time O(d^k) for maximum degree d, and each
+    augmentation gains more than delta, so there are at most
+    k n^2 / (2 eps) of them; in practice a few passes over the vertices
+    suffice, making this much faster than max_weight_matching on large
+    graphs of small degree.
+    """
+    if not 0 < eps < 1:
+        raise ValueError("approximate_weight_matching: eps must be in (0,1)")
+    vertices, edges, neighbors = _Edges(G)
+    n = len(vertices)
+    adjacent = [[] for v in range(n)]
+    for i, j, w in edges:
+        if w > 0:
+            adjacent[i].append((j, w))
+            adjacent[j].append((i, w))
+    maxweight = max((w for i, j, w in edges), default=0)
+    if maxweight <= 0:
+        return {}
+    k = max(1, math.ceil(1 / eps - 0.5))
+    delta = eps * maxweight / (k * n)
+    mate = [-1] * n
+    matched = [0] * n           # weight of the matched edge at each vertex
+
+    # greedy matching, heaviest edges first
+    for i, j, w in sorted(edges, key=lambda e: e[2], reverse=True):
+        if w > 0 and mate[i] == -1 and mate[j] == -1:
+            mate[i], mate[j] = j, i
+            matched[i] = matched[j] = w
+
+    def search(v):
+        """
+        Find the augmentation of greatest gain, if more than delta,
+        that starts with an unmatched edge at v. Returns a list of
+        triples (y, x, weight) of the edges it adds, or None.
+        """
+        best = [delta, None]
+        used = {v}
+        added = []
+
+        def extend(y, gain):
+            for x, w in adjacent[y]:
+                if x in used or x == mate[y]:
+                    continue
+                z = mate[x]
+                g = gain + w
+                if z not in used:   # otherwise z == v, already counted
+                    g -= matched[x]
+                added.append((y, x, w))
+                if g > best[0]:
+                    best[:] = [g, list(added)]
+                if len(added) < k and z >= 0 and z not in used:
+                    used.add(x)
+                    used.add(z)
+                    extend(z, g)
+                    used.remove(x)
+                    used.remove(z)
+                added.pop()
+
+        extend(v, -matched[v])
+        return best[1]
+
+    improved = True
+    while improved:
+        improved = False
+        for v in range(n):
+            added = search(v)
+            if added is None:
+                continue
+            for y, x, w in added:
+                for u in (y, x):
+                    if mate[u] >= 0:
+                        mate[mate[u]] = -1
+                        matched[mate[u]] = 0
+                        mate[u] = -1
+                        matched[u] = 0
+            for y, x, w in added:
+                mate[y], mate[x] = x, y
+                matched[y] = matched[x] = w
+            improved = True
+
+    return {vertices[v]: vertices[mate[v]] for v in range(n) if mate[v] >= 0}
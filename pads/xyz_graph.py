@@ -14,9 +14,8 @@ D. Eppstein, June 2006.
 from collections import defaultdict
 
 from .graphs import is_undirected
-from .partial_order import TopologicalOrder
 from .strong_connectivity import StronglyConnectedComponents
-from .biconnectivity import st_orientation
+from .biconnectivity import st_numbering
 
 
 def CubicMatchPartitions(G):
@@ -31,8 +30,9 @@ def CubicMatchPartitions(G):
     for v in G:
         if len(G[v]) != 3:
             raise ValueError("CubicMatchPartitions: graph is not cubic")
-    ST = st_orientation(G)
-    L = TopologicalOrder(ST)
+    L = st_numbering(G)
+    number = {v: i for i, v in enumerate(L)}
+    ST = {v: [w for w in G[v] if number[w] > number[v]] for v in G}
     for B in range(1 << (len(L) // 2 - 1)):
         # Here with a bitstring representing the sequence of choices
         out = {}
@@ -34,9 +34,99 @@ class RegExpTest(unittest.TestCase):
             L2 = RegularLanguage(L1.recognizer.RegExp())
             self.assertEqual(L1,L2)
 
+    def testLargeConversion(self):
+        """converting a many-state DFA gives a compact expression"""
+        from pads.automata import LookupNFA
+        n = 200
+        ttable = {(s,c): [(s + int(c)) % n] for s in range(n) for c in "01"}
+        N = LookupNFA({"0","1"}, [0], ttable, [0])
+        expr = N.RegExp()
+        self.assertTrue(len(expr) < 10*n)
+        L = RegularLanguage(expr)
+        for S in ["", "1"*n, "0" + "10"*n]:
+            self.assertTrue(S in L)
+        for S in ["1", "1"*(n-1), "0" + "10"*(n+1)]:
+            self.assertTrue(S not in L)
+
     def testInequivalent(self):
         """test that different regular languages are recognized as different"""
         for i in range(len(self.languages)):
             for j in range(i):
                 self.assertNotEqual(self.languages[i][0],
                                     self.languages[j][0])
+
+
+class CompiledDFATest(unittest.TestCase):
+    def testSaveLoad(self):
+        """compiled DFAs survive a round trip through a mapped file"""
+        import os
+        import tempfile
+        from pads.automata import loadDFA
+        L = RegularLanguage("(0+1)*1(0+1)(0+1)")
+        D = L.recognizer.minimize().compile()
+        fd, filename = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                D.save(f)
+            E = loadDFA(filename)
+            self.assertEqual(len(E), len(D))
+            self.assertEqual(E, D)
+            M = RegularLanguage(E)
+            self.assertEqual(M, L)
+            self.assertTrue("000100" in M)
+            self.assertTrue("0011" not in M)
+            self.assertTrue("0011" in ~M)
+            self.assertEqual(M | RegularLanguage("1+0"),
+                             L | RegularLanguage("1+0"))
+            self.assertEqual(M & RegularLanguage("(10+0)*"),
+                             L & RegularLanguage("(10+0)*"))
+        finally:
+            os.remove(filename)
+
+
+class ScannerTest(unittest.TestCase):
+    patterns = ["(0+1)*11", "(0+1)*0", "(0+1)*101", "0*+1*"]
+
+    def expected(self, text):
+        L = [RegularLanguage(p) for p in self.patterns]
+        return [(j, i) for j in range(len(text) + 1)
+                for i in range(len(L)) if text[:j] in L[i]]
+
+    def testScan(self):
+        """chunked scanning reports each prefix match exactly once"""
+        from pads.automata import Scanner
+        text = "0011010111001"
+        for maxstates in [None, 2]:
+            S = Scanner(self.patterns, maxstates=maxstates)
+            found = []
+            for start in range(0, len(text), 4):
+                found += S.scan(text[start:start+4])
+            self.assertEqual(sorted(found), self.expected(text))
+
+    def testCompiledMasks(self):
+        """states of the compiled product record which languages accept"""
+        from pads.automata import MultiLanguageDFA
+        C = MultiLanguageDFA(self.patterns).compile()
+        for text in ["", "0", "011", "0101", "1101"]:
+            state = C.initial
+            for c in text:
+                state = C.transition(state, c)
+            mask = sum(1 << i for j, i in self.expected(text)
+                       if j == len(text))
+            self.assertEqual(C.masks[state], mask)
+
+    def testSavedMasks(self):
+        """language masks survive a round trip through a mapped file"""
+        import os
+        import tempfile
+        from pads.automata import MultiLanguageDFA, loadDFA
+        C = MultiLanguageDFA(self.patterns).compile()
+        fd, filename = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                C.save(f)
+            E = loadDFA(filename)
+            self.assertEqual(list(E.masks), C.masks)
+            self.assertEqual(E, C)
+        finally:
+            os.remove(filename)
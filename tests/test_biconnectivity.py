@@ -2,7 +2,12 @@ import unittest
 
 from pads.biconnectivity import is_biconnected
 from pads.biconnectivity import st_orientation
+from pads.biconnectivity import st_numbering
+from pads.biconnectivity import STOrienter
+from pads.biconnectivity import NotBiconnected
 from pads.biconnectivity import BiconnectedComponents
+from pads.biconnectivity import BlockStructure
+from pads.biconnectivity import IncrementalBiconnectivity
 from pads.partial_order import TopologicalOrder
 
 
@@ -39,6 +44,46 @@ class BiconnectivityTest(unittest.TestCase):
         CV = sorted(sorted(component.keys()) for component in C)
         self.assertEqual(CV,[[0,2,5],[1,3,6,8],[2,3],[4,7]])
     
+    def testBlockStructure(self):
+        """Articulation points, bridges and blocks of G2."""
+        S = BlockStructure(self.G2)
+        self.assertEqual(sorted(S.articulation_points),[2,3])
+        self.assertEqual(sorted(sorted(e) for e in S.bridges),[[2,3],[4,7]])
+        self.assertEqual(S.nblocks,4)
+        self.assertEqual(S.edge_block(1,8),S.edge_block(3,6))
+        self.assertNotEqual(S.edge_block(0,2),S.edge_block(2,3))
+        components = {}
+        for v in self.G2:
+            components.setdefault(S.two_edge_component[v],[]).append(v)
+        self.assertEqual(sorted(components.values()),
+                         [[0,2,5],[1,3,6,8],[4],[7]])
+        T = S.block_cut_tree()
+        self.assertEqual(len(T),6)
+        self.assertEqual(len(T["cut",3]),2)
+
+    def testIncrementalBiconnectivity(self):
+        """Blocks of G2 as edges are added to it."""
+        B = IncrementalBiconnectivity(self.G2)
+        self.assertEqual(B.num_blocks(),4)
+        self.assertTrue(B.is_articulation(3))
+        self.assertFalse(B.same_block(0,3))
+        B.add_edge(5,6)
+        self.assertEqual(B.num_blocks(),2)
+        self.assertFalse(B.is_articulation(3))
+        self.assertTrue(B.same_block(0,3))
+        self.assertFalse(B.connected(0,7))
+        B.add_edge(7,0)
+        self.assertEqual(B.num_blocks(),3)
+        self.assertTrue(B.is_articulation(0))
+        self.assertTrue(B.is_articulation(7))
+        self.assertTrue(B.same_block(0,7))
+        self.assertFalse(B.same_block(4,0))
+        B.add_edge(4,8)
+        self.assertEqual(B.num_blocks(),1)
+        self.assertFalse(B.is_articulation(7))
+        B.add_edge("x","y")
+        self.assertEqual(B.num_blocks(),2)
+
     def test_st_orientation(self):
         STO = st_orientation(self.G1)
         L = list(TopologicalOrder(STO))
@@ -49,3 +94,26 @@ class BiconnectivityTest(unittest.TestCase):
         outdegree = dict([(v,len(STO[v])) for v in self.G1])
         self.assertEqual(len([v for v in self.G1 if indegree[v] == 0]), 1)
         self.assertEqual(len([v for v in self.G1 if outdegree[v] == 0]), 1)
+
+    def test_STOrienter(self):
+        """The deprecated wrapper agrees with an st-orientation."""
+        with self.assertWarns(DeprecationWarning):
+            S = STOrienter(self.G1)
+        self.assertEqual(len(S.roots),1)
+        edges = S.roots + S.orient[S.roots[0]]
+        O = {v:{w for u,w in edges if u == v} for v in self.G1}
+        sources = [v for v in self.G1 if all(v not in O[u] for u in O)]
+        self.assertEqual(sources,[S.roots[0][0]])
+        TopologicalOrder(O)
+        self.assertEqual(sum(len(O[v]) for v in O),
+                         sum(len(self.G1[v]) for v in self.G1)//2)
+
+    def test_st_numbering(self):
+        L = st_numbering(self.G1,5,1)
+        self.assertEqual((L[0],L[-1]),(5,1))
+        self.assertEqual(sorted(L),sorted(self.G1))
+        number = {v:i for i,v in enumerate(L)}
+        for v in L[1:-1]:
+            self.assertTrue(min(number[w] for w in self.G1[v]) < number[v])
+            self.assertTrue(max(number[w] for w in self.G1[v]) > number[v])
+        self.assertRaises(NotBiconnected,st_numbering,self.G2)
@@ -1,6 +1,10 @@
 import unittest
 
 from pads.bipartite import is_bipartite
+from pads.bipartite import two_color
+from pads.bipartite import odd_core
+from pads.bipartite import odd_core_mask
+from pads.bipartite import NonBipartite
 
 
 class BipartitenessTest(unittest.TestCase):
@@ -14,3 +18,23 @@ class BipartitenessTest(unittest.TestCase):
     def testOddCycles(self):
         for i in range(3,12,2):
             self.assertEqual(is_bipartite(self.cycle(i)), False)
+
+    def testOddCycleWitness(self):
+        G = self.cycle(9)
+        G[0].append(4)
+        G[4].append(0)
+        try:
+            two_color(G)
+            self.fail("two_color did not raise NonBipartite")
+        except NonBipartite as e:
+            C = e.cycle
+        self.assertEqual(len(C) % 2, 1)
+        for i in range(len(C)):
+            self.assertTrue(C[i-1] in G[C[i]])
+
+    def testOddCore(self):
+        """Triangle and square sharing a vertex, with a pendant edge."""
+        G = {0:[1,2],1:[0,2],2:[0,1,3,5],3:[2,4],4:[3,5],5:[2,4,6],6:[5]}
+        self.assertEqual(odd_core(G), {0:{1,2},1:{0,2},2:{0,1}})
+        mask = odd_core_mask(G)
+        self.assertEqual(sorted(v for v in G if mask[v]), [0,1,2])
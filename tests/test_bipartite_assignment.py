@@ -0,0 +1,30 @@
+import unittest
+
+from pads.bipartite_assignment import min_cost_matching
+from pads.bipartite_assignment import auction_matching
+
+
+class AssignmentTest(unittest.TestCase):
+    # costs (i-j)^2 on a complete 6x6 graph, with one row shifted
+    G = {i:{j:(i-j)**2 for j in range(6)} for i in range(6)}
+    G[0] = {j:(3-j)**2 for j in range(6)}
+
+    def cost(self,M):
+        return sum(self.G[M[v]][v] for v in M)
+
+    def testShortestPaths(self):
+        M = min_cost_matching(self.G)
+        self.assertEqual(len(M),6)
+        self.assertEqual(self.cost(M),3)
+
+    def testAuction(self):
+        M = auction_matching(self.G)
+        self.assertEqual(len(M),6)
+        self.assertEqual(self.cost(M),3)
+        M = auction_matching(self.G,processes=2,chunksize=2)
+        self.assertEqual(self.cost(M),3)
+
+    def testImperfect(self):
+        G = {'a':{'x':10}, 'b':{'x':1}, 'c':{'x':3, 'y':5}}
+        self.assertEqual(min_cost_matching(G),{'x':'b', 'y':'c'})
+        self.assertRaises(ValueError, auction_matching, G)
@@ -0,0 +1,60 @@
+import unittest
+
+from pads.bipartite_matching import matching
+from pads.bipartite_matching import imperfections
+from pads.bipartite_matching import DulmageMendelsohn
+
+
+class MatchingTest(unittest.TestCase):
+    def path(self,n):
+        # path of 2n vertices, ordered so that the greedy initial
+        # matching leaves a single augmenting path through all of them
+        return {i:[i-1,i] if i else [0] for i in reversed(range(n))}
+
+    def testLongPath(self):
+        n = 20000   # much longer than the recursion limit
+        M,A,B = matching(self.path(n))
+        self.assertEqual(len(M),n)
+        self.assertEqual(len(A)+len(B),n)
+
+    def testIndependentSet(self):
+        G = {'a':[1,2,3], 'b':[1], 'c':[1]}
+        M,A,B = matching(G)
+        self.assertEqual(len(M),2)
+        self.assertEqual(set(A),{'b','c'})
+        self.assertEqual(set(B),{2,3})
+
+    def testWarmStart(self):
+        G = self.path(10)
+        M,A,B = matching(G)
+        G[9].append(10)
+        G[10] = [11]
+        M,A,B = matching(G,M)
+        self.assertEqual(len(M),11)
+        M,A,B = matching(G,{5:4, 6:3})   # bad pairs are ignored
+        self.assertEqual(len(M),11)
+
+
+class DulmageMendelsohnTest(unittest.TestCase):
+    def testCoarse(self):
+        # a and b compete for x; c,d and y,z form a 4-cycle;
+        # e has both w and q to itself, and c-x crosses between parts
+        G = {'a':['x'], 'b':['x'], 'c':['y','z','x'], 'd':['y','z'],
+             'e':['w','q']}
+        D = DulmageMendelsohn(G)
+        coarse = {u:D.coarseU[i] for i,u in enumerate(D.U)}
+        self.assertEqual(coarse,{'a':0, 'b':0, 'c':1, 'd':1, 'e':2})
+        self.assertEqual(D.components,1)
+        self.assertTrue(D.allowed('b','x'))
+        self.assertTrue(D.allowed('c','z'))
+        self.assertFalse(D.allowed('c','x'))
+        self.assertEqual(D.forbidden(),[('c','x')])
+
+    def testImperfections(self):
+        # two 4-cycles joined by one edge, which no perfect matching uses
+        G = {0:[0,1], 1:[0,1,2], 2:[2,3], 3:[2,3]}
+        D = DulmageMendelsohn(G)
+        self.assertEqual(D.components,2)
+        I = imperfections(G)
+        self.assertEqual(D.forbidden(),
+                         [(u,v) for u in I for v in I[u]])
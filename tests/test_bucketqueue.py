@@ -0,0 +1,40 @@
+import unittest
+
+from pads.bucketqueue import BucketQueue
+from pads.bucketqueue import ArrayBucketQueue
+from pads.bucketqueue import RadixHeap
+
+
+class BucketQueueTest(unittest.TestCase):
+    priorities = {0:5, 1:2, 2:7, 3:2, 4:0}
+
+    def testBucketQueues(self):
+        """All three queues return items in priority order."""
+        for Q in [BucketQueue(), ArrayBucketQueue(5,7), RadixHeap()]:
+            for x,p in self.priorities.items():
+                Q[x] = p
+            del Q[2]
+            self.assertEqual(len(Q),4)
+            self.assertFalse(2 in Q)
+            self.assertEqual([p for x,p in Q.items()],[0,2,2,5])
+
+    def testDecrement(self):
+        """Decrementing moves an item to the next lower bucket."""
+        Q = ArrayBucketQueue(5,7)
+        for x,p in self.priorities.items():
+            Q[x] = p
+        Q.decrement(2)
+        Q.decrement(3)
+        self.assertEqual(Q[3],1)
+        self.assertEqual(list(Q),[4,3,1,0,2])
+        self.assertRaises(ValueError,Q.__setitem__,0,8)
+
+    def testRadixHeapMonotone(self):
+        """RadixHeap rejects priorities below the last one removed."""
+        Q = RadixHeap()
+        Q["a"] = 10**20
+        Q["b"] = 3
+        self.assertEqual(next(Q.items()),("b",3))
+        self.assertRaises(ValueError,Q.__setitem__,"c",2)
+        Q["a"] = 10**10
+        self.assertEqual(list(Q.items()),[("a",10**10)])
@@ -0,0 +1,75 @@
+import unittest
+
+from pads.cardinality_matching import matching
+from pads.cardinality_matching import DynamicMatching
+from pads.cardinality_matching import karp_sipser_matching
+
+
+class MatchingTest(unittest.TestCase):
+    def cycle(self,n):
+        return {i:{(i-1)%n:1,(i+1)%n:1} for i in range(n)}
+
+    def testOddCycles(self):
+        for n in range(3,20,2):
+            M = matching(self.cycle(n))
+            self.assertEqual(len(M),n-1)
+
+    def testManyPaths(self):
+        # many disjoint augmenting paths, each through a blossom,
+        # starting from a matching that leaves all of them open
+        G = {}
+        initial = {}
+        for i in range(0,100,6):
+            a,b,c,d,e,f = range(i,i+6)
+            for v,w in [(a,b),(b,c),(c,d),(d,b),(c,e),(d,f)]:
+                G.setdefault(v,{})[w] = G.setdefault(w,{})[v] = 1
+            initial.update({b:c, c:b})
+        M = matching(G,initial)
+        self.assertEqual(len(M),len(G))
+        for v in M:
+            self.assertEqual(M[M[v]],v)
+            self.assertIn(M[v],G[v])
+
+    def testKarpSipserTree(self):
+        # the degree-one rule alone finds maximum matchings in trees
+        G = {i:{} for i in range(40)}
+        for i in range(1,40):
+            G[i][(i-1)//3] = G[(i-1)//3][i] = 1
+        M = karp_sipser_matching(G)
+        self.assertEqual(len(M),len(matching(G)))
+        for v in M:
+            self.assertEqual(M[M[v]],v)
+            self.assertIn(M[v],G[v])
+
+
+class DynamicMatchingTest(unittest.TestCase):
+    def testPathUpdates(self):
+        # grow a path one edge at a time, then cut it apart again
+        D = DynamicMatching({0:[]})
+        for i in range(1,20):
+            D.add_vertex(i)
+            D.add_edge(i-1,i)
+            self.assertEqual(len(D),(i+1)//2)
+        D.remove_edge(9,10)
+        self.assertEqual(len(D),10)
+        D.remove_edge(4,5)
+        self.assertEqual(len(D),9)
+        D.remove_vertex(0)
+        self.assertEqual(len(D),9)
+        D.remove_vertex(1)
+        self.assertEqual(len(D),8)
+        D.add_edge(4,5)
+        D.add_edge(9,10)
+        self.assertEqual(len(D),9)
+        for v in D.matching:
+            self.assertEqual(D[D[v]],v)
+            self.assertIn(D[v],D.graph[v])
+
+    def testBlossomUpdate(self):
+        # closing an odd cycle next to an unmatched vertex
+        D = DynamicMatching({0:[1], 1:[0,2], 2:[1,3], 3:[2,4], 4:[3], 5:[]})
+        self.assertEqual(len(D),2)
+        D.add_edge(4,0)
+        D.add_edge(5,2)
+        self.assertEqual(len(D),3)
+        self.assertIn(5,D)
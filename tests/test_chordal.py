@@ -2,6 +2,8 @@ import unittest
 
 from pads.chordal import is_chordal
 from pads.chordal import perfect_elimination_ordering
+from pads.chordal import ChordalStructure
+from pads.chordal import minimal_triangulation
 
 
 class ChordalTest(unittest.TestCase):
@@ -27,3 +29,24 @@ class ChordalTest(unittest.TestCase):
                         for x in G[v]:
                             if w != x and w not in eliminated and x not in eliminated:
                                 self.assertTrue(w in G[x] and x in G[w]) 
+
+    def testChordalStructure(self):
+        """Cliques, clique tree, coloring and independent set of butterfly."""
+        C = ChordalStructure(ChordalTest.butterfly)
+        self.assertEqual(sorted(sorted(K) for K in C.maximal_cliques()),
+                         [[0,1,2],[0,3,4]])
+        T = C.clique_tree()
+        self.assertEqual(T[frozenset([0,1,2])],{frozenset([0,3,4])})
+        color = C.coloring()
+        self.assertEqual(sorted(color.values()),[0,1,1,2,2])
+        self.assertEqual(len(C.maximum_independent_set()),2)
+        self.assertRaises(ValueError,ChordalStructure,ChordalTest.quad)
+
+    def testMinimalTriangulation(self):
+        """Fill edges make quad chordal and leave diamond unchanged."""
+        H,order = minimal_triangulation(ChordalTest.quad)
+        self.assertEqual(sum(len(H[v]) for v in H),10)
+        self.assertTrue(is_chordal(H))
+        H,order = minimal_triangulation(ChordalTest.diamond)
+        self.assertEqual(H,{v:set(ChordalTest.diamond[v])
+                            for v in ChordalTest.diamond})
@@ -0,0 +1,35 @@
+import unittest
+
+from pads.clique_counting import triangle_count
+from pads.clique_counting import count_k_cliques
+from pads.clique_counting import k_cliques
+from pads.clique_counting import vertex_triangle_counts
+from pads.clique_counting import edge_triangle_counts
+from pads.clique_counting import clustering_coefficients
+
+
+class CliqueCountingTest(unittest.TestCase):
+    # complete graph K4 on 0..3, with a pendant triangle 3,4,5
+    G = {0:[1,2,3],1:[0,2,3],2:[0,1,3],3:[0,1,2,4,5],4:[3,5],5:[3,4]}
+
+    def testCounts(self):
+        self.assertEqual(triangle_count(self.G),5)
+        self.assertEqual(triangle_count(self.G,processes=2,chunksize=2),5)
+        self.assertEqual(count_k_cliques(self.G,2),9)
+        self.assertEqual(count_k_cliques(self.G,4),1)
+        self.assertEqual(count_k_cliques(self.G,5),0)
+
+    def testListing(self):
+        self.assertEqual([sorted(C) for C in k_cliques(self.G,4)],
+                         [[0,1,2,3]])
+        self.assertEqual(len(list(k_cliques(self.G,3))),5)
+
+    def testLocalCounts(self):
+        self.assertEqual(vertex_triangle_counts(self.G),
+                         {0:3,1:3,2:3,3:4,4:1,5:1})
+        T = edge_triangle_counts(self.G)
+        self.assertEqual(T[0][1],2)
+        self.assertEqual(T[3][4],1)
+        C = clustering_coefficients(self.G)
+        self.assertEqual(C[0],1.0)
+        self.assertEqual(C[3],0.4)
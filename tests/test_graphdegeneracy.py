@@ -3,6 +3,8 @@ import unittest
 from pads.graphdegeneracy import degeneracy
 from pads.graphdegeneracy import core
 from pads.graphdegeneracy import triangles
+from pads.graphdegeneracy import core_numbers
+from pads.graphdegeneracy import CoreDecomposition
 
 
 class DegeneracyTest(unittest.TestCase):
@@ -14,6 +16,21 @@ class DegeneracyTest(unittest.TestCase):
     def testCore(self):
         self.assertEqual(core(DegeneracyTest.G),{1,2,3,4,5})
 
+    def testCoreNumbers(self):
+        self.assertEqual(list(core_numbers(DegeneracyTest.G)),[2,2,2,2,2,1])
+        self.assertEqual(list(core_numbers(DegeneracyTest.G,processes=2,
+                                           chunksize=2)),[2,2,2,2,2,1])
+
+    def testCoreDecomposition(self):
+        D = CoreDecomposition(DegeneracyTest.G)
+        self.assertEqual(D.degeneracy(),2)
+        self.assertEqual(D.core(1),{1,2,3,4,5,6})
+        self.assertEqual(D.core(3),{1,2,3,4,5})
+        O = D.orientation()
+        self.assertEqual(sum(len(O[v]) for v in O),7)
+        self.assertTrue(max(len(O[v]) for v in O) <= 2)
+        self.assertEqual([v for v,d in D.sequence()][0],6)
+
     def testTriangles(self):
         T = list(triangles(DegeneracyTest.G))
         self.assertEqual(len(T),1)
@@ -0,0 +1,33 @@
+import unittest
+
+from pads.interval_graphs import is_interval
+from pads.interval_graphs import is_proper_interval
+from pads.interval_graphs import interval_ordering
+
+
+class IntervalGraphTest(unittest.TestCase):
+    claw = {0:[1,2,3],1:[0],2:[0],3:[0]}
+    path = {0:[1],1:[0,2],2:[1,3],3:[2]}
+    quad = {0:[1,3],1:[0,2],2:[1,3],3:[0,2]}
+    # subdivided claw: a tree that is not a caterpillar
+    tree = {0:[1,3,5],1:[0,2],2:[1],3:[0,4],4:[3],5:[0,6],6:[5]}
+
+    def testInterval(self):
+        self.assertTrue(is_interval(self.claw))
+        self.assertTrue(is_interval(self.path))
+        self.assertFalse(is_interval(self.quad))
+        self.assertFalse(is_interval(self.tree))
+
+    def testProperInterval(self):
+        self.assertFalse(is_proper_interval(self.claw))
+        self.assertTrue(is_proper_interval(self.path))
+        self.assertFalse(is_proper_interval(self.quad))
+
+    def testIntervalOrdering(self):
+        L = interval_ordering(self.claw)
+        position = {v:i for i,v in enumerate(L)}
+        for u in self.claw:
+            for w in self.claw[u]:
+                for v in self.claw:
+                    if position[u] < position[v] < position[w]:
+                        self.assertTrue(v in self.claw[u])
@@ -0,0 +1,23 @@
+import unittest
+
+from pads.lex_bfs import lex_bfs
+from pads.lex_bfs import LexSweeps
+
+
+class LexBFSTest(unittest.TestCase):
+    # path 0-1-2-3 with a pendant vertex 4 attached to 1
+    G = {0:[1],1:[0,2,4],2:[1,3],3:[2],4:[1]}
+
+    def testLexBFS(self):
+        L = list(lex_bfs(self.G))
+        self.assertEqual(sorted(L),[0,1,2,3,4])
+        position = {v:i for i,v in enumerate(L)}
+        self.assertTrue(position[3] > position[2])
+
+    def testTieBreaking(self):
+        S = LexSweeps(self.G)
+        self.assertEqual(list(S.lex_bfs()),[0,1,2,4,3])
+        self.assertEqual(list(S.lex_bfs([0,4,3,2,1])),[0,1,4,2,3])
+        self.assertEqual(list(S.lex_bfs_plus(S.lex_bfs())),[3,2,1,4,0])
+        self.assertEqual(list(S.lex_dfs([3,0,1,2,4])),[3,2,1,0,4])
+        self.assertEqual(list(S.lex_dfs()),[0,1,2,3,4])
@@ -2,6 +2,7 @@ import unittest
 
 from pads.partial_order import isAcyclic
 from pads.partial_order import TransitiveClosure
+from pads.partial_order import TransitiveReduction
 from pads.partial_order import MaximumAntichain
 from pads.partial_order import MinimumChainDecomposition
 
@@ -18,6 +19,12 @@ class PartialOrderTest(unittest.TestCase):
             self.assertEqual(TC[i],
                 {j for j in range(16) if i & j == i and i != j})
 
+    def testHypercubeReduction(self):
+        cube = {i:set(self.cube[i]) for i in self.cube}
+        self.assertEqual(TransitiveReduction(self.cube), cube)
+        self.assertEqual(TransitiveReduction(TransitiveClosure(self.cube)),
+                         cube)
+
     def testHypercubeAntichain(self):        
         A = MaximumAntichain(self.cube)
         self.assertEqual(A,{3,5,6,9,10,12})
@@ -25,3 +32,15 @@ class PartialOrderTest(unittest.TestCase):
     def testHypercubeDilworth(self):
         CD = list(MinimumChainDecomposition(self.cube))
         self.assertEqual(len(CD),6)
+
+    def testClosureDilworth(self):
+        # long chains that are only comparable through the closure,
+        # plus an isolated element that must appear in the antichain
+        G = {i:[i+2] for i in range(20)}
+        G.update({20:[], 21:[], 'x':[]})
+        CD = list(MinimumChainDecomposition(G))
+        self.assertEqual(len(CD),3)
+        self.assertEqual(sorted(len(C) for C in CD),[1,11,11])
+        A = MaximumAntichain(G)
+        self.assertEqual(len(A),3)
+        self.assertIn('x',A)
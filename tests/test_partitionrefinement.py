@@ -0,0 +1,45 @@
+import unittest
+
+from pads.partition_refinement import PartitionRefinement
+from pads.partition_refinement import PartitionError
+from pads.partition_refinement import IntegerPartitionRefinement
+from pads.partition_refinement import ArrayPartitionRefinement
+
+
+class PartitionRefinementTest(unittest.TestCase):
+    def testIntegerPartitionRefinement(self):
+        P = IntegerPartitionRefinement(8)
+        self.assertEqual(P.refine([5,1,5,3]),[(1,0)])
+        self.assertEqual(sorted(P.members(1)),[1,3,5])
+        self.assertEqual(P.refine([0,1,2,3,4,5,6,7]),[])
+        self.assertEqual(P.refine([3,4]),[(2,1),(3,0)])
+        self.assertEqual([P[x] for x in range(8)],[0,1,0,2,3,1,0,0])
+        self.assertEqual(P.end[2],P.start[1])
+        P.remove(3)
+        self.assertEqual(P[3],-1)
+        self.assertEqual(P.size(2),0)
+        self.assertEqual(len(P),4)
+        P.add(3,0)
+        P.add(8,2)
+        self.assertEqual(sorted(P.members(0)),[0,2,3,6,7])
+        self.assertEqual(list(P.members(2)),[8])
+        self.assertEqual([P.position[x] for x in P.element],list(range(9)))
+        self.assertRaises(PartitionError,P.add,3,1)
+
+    def testArrayPartitionRefinement(self):
+        """Same results as the set-based partition."""
+        A = PartitionRefinement("abcdefg")
+        B = ArrayPartitionRefinement("abcdefg")
+        for S in ["ace","xab","fg","bd"]:
+            self.assertEqual(
+                sorted((sorted(new),sorted(old)) for new,old in A.refine(S)),
+                sorted((sorted(new),sorted(old)) for new,old in B.refine(S)))
+        A.remove("d")
+        B.remove("d")
+        A.add("h",A["g"])
+        B.add("h",B["g"])
+        self.assertEqual(sorted(sorted(S) for S in A),
+                         sorted(sorted(S) for S in B))
+        self.assertTrue("h" in B["f"])
+        B.freeze()
+        self.assertEqual(B["c"],frozenset("ce"))
@@ -1,6 +1,7 @@
 import unittest
 
 from pads.acyclic_reachability import Reachability
+from pads.acyclic_reachability import ReachabilityIndex
 
 
 class ReachabilityTest(unittest.TestCase):
@@ -11,3 +12,13 @@ class ReachabilityTest(unittest.TestCase):
             for t in "ABCDE":
                 self.assertEqual(R.reachable(s,t),
                                  s <= t and s+t not in ["AB","DE"])
+
+    def testIndex(self):
+        """ReachabilityIndex answers single and batched queries."""
+        G = {"A":["C"],"B":["C","D"],"C":["D","E"],"D":[],"E":[]}
+        for chunk in [1,2,4096]:
+            R = ReachabilityIndex(G, chunk=chunk)
+            pairs = [(s,t) for s in "ABCDE" for t in "ABCDE"]
+            expected = [s <= t and s+t not in ["AB","DE"] for s,t in pairs]
+            self.assertEqual([R.reachable(s,t) for s,t in pairs], expected)
+            self.assertEqual(R.reachable_many(pairs), expected)
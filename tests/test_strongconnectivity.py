@@ -2,6 +2,7 @@ import unittest
 
 from pads.strong_connectivity import StronglyConnectedComponents
 from pads.strong_connectivity import Condensation
+from pads.strong_connectivity import ComponentNumbers
 
 
 class StrongConnectivityTest(unittest.TestCase):
@@ -47,3 +48,20 @@ class StrongConnectivityTest(unittest.TestCase):
         """Check that the condensations are what we expect."""
         self.assertEqual(Condensation(self.G1),self.Con1)
         self.assertEqual(Condensation(self.G2),self.Con2)
+
+    def testComponentNumbers(self):
+        """Check integer component numbering against known components."""
+        for (graph,expectedoutput) in self.knownpairs:
+            offsets = [0]
+            targets = []
+            for v in range(len(graph)):
+                targets += graph[v]
+                offsets.append(len(targets))
+            count, component = ComponentNumbers(offsets, targets)
+            self.assertEqual(count, len(expectedoutput))
+            output = sorted(sorted(v for v in graph if component[v] == c)
+                            for c in range(count))
+            self.assertEqual(output, expectedoutput)
+            for v in graph:
+                for w in graph[v]:
+                    self.assertTrue(component[v] >= component[w])
@@ -3,6 +3,9 @@ import unittest
 from pads.two_satisfiability import Forced
 from pads.two_satisfiability import Not
 from pads.two_satisfiability import Satisfiable
+from pads.two_satisfiability import SatisfyingAssignment
+from pads.two_satisfiability import ForcedLiterals
+from pads.two_satisfiability import ForcedChains
 
 
 class TwoSatTest(unittest.TestCase):
@@ -18,3 +21,21 @@ class TwoSatTest(unittest.TestCase):
         """Check that we can correctly identify forced variables."""
         self.assertEqual(Forced(self.T1),{1:False})
         self.assertEqual(Forced(self.T2),None)
+
+    # T1 and T2 as integer clauses, with variable i-1 standing for i
+    C1 = [(1,2), (1,4), (3,1), (3,4)]
+    C2 = [(1,2), (3,1), (0,4), (5,6), (5,2), (7,0)]
+
+    def testClauses(self):
+        """Check the integer clause interface on the same problems."""
+        A = SatisfyingAssignment(4, self.C1)
+        for x, y in self.C1:
+            self.assertTrue(A[x >> 1] != (x & 1) or A[y >> 1] != (y & 1))
+        self.assertEqual(SatisfyingAssignment(4, self.C2), None)
+        self.assertEqual(ForcedLiterals(4, self.C1), {0:False})
+        self.assertEqual(ForcedLiterals(4, self.C2), None)
+
+    def testForcedChains(self):
+        """Check that forced values are justified by implication chains."""
+        self.assertEqual(ForcedChains(self.T1),{1:[1,2,Not(1)]})
+        self.assertEqual(ForcedChains(self.T2),None)
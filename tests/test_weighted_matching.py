@@ -0,0 +1,53 @@
+import random
+import unittest
+
+from pads.weighted_matching import max_weight_matching
+from pads.weighted_matching import approximate_weight_matching
+
+
+class WeightedMatchingTest(unittest.TestCase):
+    def weight(self,G,M):
+        return sum(G[v][M[v]] for v in M)//2
+
+    def graph(self,edges):
+        G = {}
+        for v,w,x in edges:
+            G.setdefault(v,{})[w] = G.setdefault(w,{})[v] = x
+        return G
+
+    def testPath(self):
+        # greedy takes the middle edge, optimum takes the two outer ones
+        G = self.graph([(1,2,5),(2,3,6),(3,4,5)])
+        self.assertEqual(max_weight_matching(G),{1:2,2:1,3:4,4:3})
+        self.assertEqual(self.weight(G,approximate_weight_matching(G)),10)
+
+    def testBlossom(self):
+        # a triangle with heavy edges leading out of it needs a blossom
+        G = self.graph([(1,2,8),(2,3,9),(1,3,10),(3,4,7),(1,6,5),(4,5,6)])
+        M = max_weight_matching(G)
+        self.assertEqual(self.weight(G,M),20)
+        self.assertEqual(M[1],6)
+
+    def testNonpositive(self):
+        G = self.graph([(1,2,-1),(2,3,0)])
+        self.assertEqual(max_weight_matching(G),{})
+
+    def testAsymmetric(self):
+        G = {1:{2:1}, 2:{1:2}}
+        self.assertRaises(ValueError, max_weight_matching, G)
+
+    def testApproximation(self):
+        """Approximate matchings are within 1 - eps of the maximum."""
+        random.seed(0)
+        for trial in range(50):
+            G = {v:{} for v in range(10)}
+            for v in range(10):
+                for w in range(v):
+                    if random.random() < 0.4:
+                        G[v][w] = G[w][v] = random.randint(1,10)
+            best = self.weight(G,max_weight_matching(G))
+            for eps in [0.5,0.25,0.1]:
+                M = approximate_weight_matching(G,eps)
+                self.assertTrue(all(M[M[v]] == v for v in M))
+                self.assertTrue(self.weight(G,M) >= (1-eps)*best)
+        self.assertRaises(ValueError, approximate_weight_matching, G, 0)